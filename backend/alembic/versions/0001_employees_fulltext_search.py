@@ -0,0 +1,37 @@
+"""employees: FULLTEXT (ngram) index cho tìm kiếm theo tên / mã
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18
+
+Schema gốc được tạo bằng Base.metadata.create_all (app/main.py); các
+migration chỉ bổ sung phần còn thiếu trên DB đang chạy nên đều kiểm tra
+trước khi tạo / xóa (DB mới tạo từ models đã có sẵn index).
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+INDEX_NAME = "ft_employees_full_name_code"
+
+
+def _has_index(table, name):
+    inspector = sa.inspect(op.get_bind())
+    return any(ix["name"] == name for ix in inspector.get_indexes(table))
+
+
+def upgrade():
+    if not _has_index("employees", INDEX_NAME):
+        op.execute(
+            f"CREATE FULLTEXT INDEX {INDEX_NAME} "
+            "ON employees (full_name, code) WITH PARSER ngram"
+        )
+
+
+def downgrade():
+    if _has_index("employees", INDEX_NAME):
+        op.drop_index(INDEX_NAME, table_name="employees")
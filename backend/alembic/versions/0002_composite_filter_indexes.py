@@ -0,0 +1,47 @@
+"""Composite index khớp với bộ lọc của các endpoint danh sách
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18
+
+Kiểm tra lại bằng: python explain_queries.py
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+INDEXES = [
+    ("ix_employees_deleted_department_status_id", "employees", ["deleted", "department_id", "status", "id"]),
+    ("ix_payrolls_employee_year_month", "payrolls", ["employee_id", "year", "month"]),
+    ("ix_timesheets_employee_date", "timesheets", ["employee_id", "date"]),
+    ("ix_reward_discipline_employee_date", "reward_discipline", ["employee_id", "date"]),
+    ("ix_labor_contracts_employee_end_date", "labor_contracts", ["employee_id", "end_date"]),
+]
+
+
+def _has_index(table, name):
+    inspector = sa.inspect(op.get_bind())
+    return any(ix["name"] == name for ix in inspector.get_indexes(table))
+
+
+def upgrade():
+    for name, table, columns in INDEXES:
+        if not _has_index(table, name):
+            op.create_index(name, table, columns)
+
+
+def downgrade():
+    for name, table, columns in reversed(INDEXES):
+        if not _has_index(table, name):
+            continue
+        # MySQL có thể đã bỏ index tự tạo cho khóa ngoại vì composite index
+        # thay thế được; tạo lại trước khi drop để không vướng lỗi FK.
+        if columns[0] == "employee_id":
+            fk_index = f"ix_{table}_employee_id"
+            if not _has_index(table, fk_index):
+                op.create_index(fk_index, table, ["employee_id"])
+        op.drop_index(name, table_name=table)
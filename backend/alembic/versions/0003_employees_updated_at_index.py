@@ -0,0 +1,31 @@
+"""employees: index updated_at cho ETag của danh sách
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+INDEX_NAME = "ix_employees_updated_at"
+
+
+def _has_index(table, name):
+    inspector = sa.inspect(op.get_bind())
+    return any(ix["name"] == name for ix in inspector.get_indexes(table))
+
+
+def upgrade():
+    if not _has_index("employees", INDEX_NAME):
+        op.create_index(INDEX_NAME, "employees", ["updated_at"])
+
+
+def downgrade():
+    if _has_index("employees", INDEX_NAME):
+        op.drop_index(INDEX_NAME, table_name="employees")
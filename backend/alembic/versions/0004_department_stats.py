@@ -0,0 +1,81 @@
+"""Bảng tổng hợp department_stats / department_payroll_stats
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18
+
+create_all lúc khởi động app có thể đã tạo 2 bảng này (rỗng) trước khi migrate,
+nên upgrade luôn tính lại số liệu từ dữ liệu gốc (giống rebuild_department_stats.py).
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+REBUILD_STATEMENTS = [
+    "DELETE FROM department_stats",
+    "INSERT INTO department_stats "
+    "(department_id, headcount_active, headcount_inactive, headcount_leave, "
+    "graded_count, base_salary_sum, updated_at) "
+    "SELECT e.department_id, "
+    "SUM(CASE WHEN e.status = 'active' THEN 1 ELSE 0 END), "
+    "SUM(CASE WHEN e.status = 'inactive' THEN 1 ELSE 0 END), "
+    "SUM(CASE WHEN e.status = 'leave' THEN 1 ELSE 0 END), "
+    "COUNT(g.id), COALESCE(SUM(g.base_salary), 0), UTC_TIMESTAMP() "
+    "FROM employees e "
+    "LEFT JOIN salary_grades g ON e.salary_grade_id = g.id "
+    "WHERE e.deleted = 0 AND e.department_id IS NOT NULL "
+    "GROUP BY e.department_id",
+    "DELETE FROM department_payroll_stats",
+    "INSERT INTO department_payroll_stats "
+    "(department_id, year, month, payroll_count, payroll_total, updated_at) "
+    "SELECT e.department_id, p.year, p.month, "
+    "COUNT(p.id), COALESCE(SUM(p.total_salary), 0), UTC_TIMESTAMP() "
+    "FROM payrolls p "
+    "JOIN employees e ON p.employee_id = e.id "
+    "WHERE e.department_id IS NOT NULL "
+    "GROUP BY e.department_id, p.year, p.month",
+]
+
+
+def _has_table(name):
+    return sa.inspect(op.get_bind()).has_table(name)
+
+
+def upgrade():
+    if not _has_table("department_stats"):
+        op.create_table(
+            "department_stats",
+            sa.Column("department_id", sa.BigInteger, sa.ForeignKey("departments.id"), primary_key=True),
+            sa.Column("headcount_active", sa.Integer, nullable=False, server_default="0"),
+            sa.Column("headcount_inactive", sa.Integer, nullable=False, server_default="0"),
+            sa.Column("headcount_leave", sa.Integer, nullable=False, server_default="0"),
+            sa.Column("graded_count", sa.Integer, nullable=False, server_default="0"),
+            sa.Column("base_salary_sum", sa.DECIMAL(16, 2), nullable=False, server_default="0"),
+            sa.Column("updated_at", sa.DateTime),
+        )
+
+    if not _has_table("department_payroll_stats"):
+        op.create_table(
+            "department_payroll_stats",
+            sa.Column("department_id", sa.BigInteger, sa.ForeignKey("departments.id"), primary_key=True),
+            sa.Column("year", sa.Integer, primary_key=True),
+            sa.Column("month", sa.Integer, primary_key=True),
+            sa.Column("payroll_count", sa.Integer, nullable=False, server_default="0"),
+            sa.Column("payroll_total", sa.DECIMAL(16, 2), nullable=False, server_default="0"),
+            sa.Column("updated_at", sa.DateTime),
+        )
+
+    # Bảng tổng hợp chỉ được cập nhật tăng dần (delta) => phải khởi tạo đúng tổng
+    for statement in REBUILD_STATEMENTS:
+        op.execute(statement)
+
+
+def downgrade():
+    if _has_table("department_payroll_stats"):
+        op.drop_table("department_payroll_stats")
+    if _has_table("department_stats"):
+        op.drop_table("department_stats")
@@ -0,0 +1,65 @@
+"""payrolls: khóa unique (employee_id, year, month)
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18
+
+Các bảng lương trùng tháng (do tạo lại nhiều lần) được gộp về bản ghi mới
+nhất trước khi tạo khóa, rồi tính lại department_payroll_stats (0004) cho
+khớp với số bảng lương còn lại.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+OLD_INDEX = "ix_payrolls_employee_year_month"
+UNIQUE_INDEX = "ux_payrolls_employee_year_month"
+COLUMNS = ["employee_id", "year", "month"]
+
+
+def _has_index(table, name):
+    inspector = sa.inspect(op.get_bind())
+    return any(ix["name"] == name for ix in inspector.get_indexes(table))
+
+
+def upgrade():
+    if _has_index("payrolls", UNIQUE_INDEX):
+        return
+
+    op.execute(
+        "DELETE p FROM payrolls p "
+        "JOIN payrolls newer "
+        "ON newer.employee_id = p.employee_id "
+        "AND newer.year = p.year "
+        "AND newer.month = p.month "
+        "AND newer.id > p.id"
+    )
+    op.execute("DELETE FROM department_payroll_stats")
+    op.execute(
+        "INSERT INTO department_payroll_stats "
+        "(department_id, year, month, payroll_count, payroll_total, updated_at) "
+        "SELECT e.department_id, p.year, p.month, "
+        "COUNT(p.id), COALESCE(SUM(p.total_salary), 0), UTC_TIMESTAMP() "
+        "FROM payrolls p "
+        "JOIN employees e ON p.employee_id = e.id "
+        "WHERE e.department_id IS NOT NULL "
+        "GROUP BY e.department_id, p.year, p.month"
+    )
+
+    # Tạo khóa unique trước, index cũ drop sau để khóa ngoại employee_id luôn có index
+    op.create_index(UNIQUE_INDEX, "payrolls", COLUMNS, unique=True)
+    if _has_index("payrolls", OLD_INDEX):
+        op.drop_index(OLD_INDEX, table_name="payrolls")
+
+
+def downgrade():
+    if not _has_index("payrolls", UNIQUE_INDEX):
+        return
+
+    if not _has_index("payrolls", OLD_INDEX):
+        op.create_index(OLD_INDEX, "payrolls", COLUMNS)
+    op.drop_index(UNIQUE_INDEX, table_name="payrolls")
@@ -0,0 +1,115 @@
+"""timesheets: partition theo tháng (RANGE TO_DAYS(date)) + bảng timesheets_archive
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-18
+
+Ràng buộc của MySQL với bảng partition:
+- mọi khóa unique (kể cả PRIMARY KEY) phải chứa cột partition => PK (id, date)
+- InnoDB không hỗ trợ khóa ngoại trên bảng partition => bỏ FK employee_id
+  (quan hệ Timesheet.employee vẫn khai báo ở ORM)
+
+Partition được tạo từ tháng nhỏ nhất đang có tới MONTHS_AHEAD tháng sau,
+cộng partition pmax. Các tháng tiếp theo được thêm bằng:
+    python manage_timesheet_partitions.py ensure
+"""
+from datetime import date
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0006"
+down_revision = "0005"
+branch_labels = None
+depends_on = None
+
+TABLE = "timesheets"
+ARCHIVE_TABLE = "timesheets_archive"
+MONTHS_AHEAD = 3
+
+
+def _has_table(name):
+    return sa.inspect(op.get_bind()).has_table(name)
+
+
+def _is_partitioned():
+    return op.get_bind().execute(
+        sa.text(
+            "SELECT COUNT(*) FROM information_schema.PARTITIONS "
+            "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = :table "
+            "AND PARTITION_NAME IS NOT NULL"
+        ),
+        {"table": TABLE},
+    ).scalar() > 0
+
+
+def _next_month(day):
+    return date(day.year + day.month // 12, day.month % 12 + 1, 1)
+
+
+def _partition_definitions():
+    first = op.get_bind().execute(sa.text(f"SELECT MIN(date) FROM {TABLE}")).scalar()
+    current = date.today().replace(day=1)
+    month = (first or current).replace(day=1)
+
+    last = current
+    for _ in range(MONTHS_AHEAD):
+        last = _next_month(last)
+
+    parts = []
+    while month <= last:
+        upper = _next_month(month)
+        parts.append(
+            f"PARTITION p{month:%Y%m} VALUES LESS THAN (TO_DAYS('{upper.isoformat()}'))"
+        )
+        month = upper
+    parts.append("PARTITION pmax VALUES LESS THAN MAXVALUE")
+    return ", ".join(parts)
+
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+
+    for fk in inspector.get_foreign_keys(TABLE):
+        op.drop_constraint(fk["name"], TABLE, type_="foreignkey")
+
+    if inspector.get_pk_constraint(TABLE)["constrained_columns"] != ["id", "date"]:
+        op.execute(f"ALTER TABLE {TABLE} DROP PRIMARY KEY, ADD PRIMARY KEY (id, date)")
+
+    if not _is_partitioned():
+        op.execute(
+            f"ALTER TABLE {TABLE} PARTITION BY RANGE (TO_DAYS(date)) ({_partition_definitions()})"
+        )
+
+    if not _has_table(ARCHIVE_TABLE):
+        op.create_table(
+            ARCHIVE_TABLE,
+            sa.Column("id", sa.BigInteger, primary_key=True, autoincrement=False),
+            sa.Column("employee_id", sa.BigInteger, nullable=False),
+            sa.Column("date", sa.Date, nullable=False),
+            sa.Column("check_in", sa.Time),
+            sa.Column("check_out", sa.Time),
+            sa.Column("working_hours", sa.DECIMAL(5, 2)),
+            sa.Index("ix_timesheets_archive_employee_date", "employee_id", "date"),
+            mysql_row_format="COMPRESSED",
+        )
+
+
+def downgrade():
+    if _has_table(ARCHIVE_TABLE):
+        # Trả dữ liệu đã lưu trữ về bảng chính trước khi bỏ bảng archive
+        columns = "id, employee_id, date, check_in, check_out, working_hours"
+        op.execute(
+            f"INSERT IGNORE INTO {TABLE} ({columns}) SELECT {columns} FROM {ARCHIVE_TABLE}"
+        )
+        op.drop_table(ARCHIVE_TABLE)
+
+    if _is_partitioned():
+        op.execute(f"ALTER TABLE {TABLE} REMOVE PARTITIONING")
+
+    inspector = sa.inspect(op.get_bind())
+    if inspector.get_pk_constraint(TABLE)["constrained_columns"] != ["id"]:
+        op.execute(f"ALTER TABLE {TABLE} DROP PRIMARY KEY, ADD PRIMARY KEY (id)")
+
+    if not inspector.get_foreign_keys(TABLE):
+        op.create_foreign_key(None, TABLE, "employees", ["employee_id"], ["id"])
@@ -0,0 +1,31 @@
+"""labor_contracts: index end_date cho danh sách hợp đồng sắp hết hạn
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-18
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0007"
+down_revision = "0006"
+branch_labels = None
+depends_on = None
+
+INDEX_NAME = "ix_labor_contracts_end_date"
+
+
+def _has_index(table, name):
+    inspector = sa.inspect(op.get_bind())
+    return any(ix["name"] == name for ix in inspector.get_indexes(table))
+
+
+def upgrade():
+    if not _has_index("labor_contracts", INDEX_NAME):
+        op.create_index(INDEX_NAME, "labor_contracts", ["end_date"])
+
+
+def downgrade():
+    if _has_index("labor_contracts", INDEX_NAME):
+        op.drop_index(INDEX_NAME, table_name="labor_contracts")
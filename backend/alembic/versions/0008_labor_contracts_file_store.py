@@ -0,0 +1,52 @@
+"""labor_contracts: cột metadata file hợp đồng (kho theo sha256)
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-18
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0008"
+down_revision = "0007"
+branch_labels = None
+depends_on = None
+
+TABLE = "labor_contracts"
+INDEX_NAME = "ix_labor_contracts_file_sha256"
+COLUMNS = [
+    ("file_sha256", sa.String(64)),
+    ("file_size", sa.BigInteger),
+    ("file_name", sa.String(255)),
+    ("content_type", sa.String(100)),
+]
+
+
+def _column_names(table):
+    return {column["name"] for column in sa.inspect(op.get_bind()).get_columns(table)}
+
+
+def _has_index(table, name):
+    inspector = sa.inspect(op.get_bind())
+    return any(ix["name"] == name for ix in inspector.get_indexes(table))
+
+
+def upgrade():
+    existing = _column_names(TABLE)
+    for name, type_ in COLUMNS:
+        if name not in existing:
+            op.add_column(TABLE, sa.Column(name, type_))
+
+    if not _has_index(TABLE, INDEX_NAME):
+        op.create_index(INDEX_NAME, TABLE, ["file_sha256"])
+
+
+def downgrade():
+    if _has_index(TABLE, INDEX_NAME):
+        op.drop_index(INDEX_NAME, table_name=TABLE)
+
+    existing = _column_names(TABLE)
+    for name, _ in reversed(COLUMNS):
+        if name in existing:
+            op.drop_column(TABLE, name)
@@ -0,0 +1,35 @@
+"""payrolls: bỏ index (employee_id, year, month) trùng với khóa unique
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-18
+
+Trên DB mới, create_all đã tạo ux_payrolls_employee_year_month nên 0005 thoát
+sớm và không drop index cũ do 0002 tạo => 2 index giống hệt nhau trên payrolls.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0009"
+down_revision = "0008"
+branch_labels = None
+depends_on = None
+
+OLD_INDEX = "ix_payrolls_employee_year_month"
+UNIQUE_INDEX = "ux_payrolls_employee_year_month"
+
+
+def _has_index(table, name):
+    inspector = sa.inspect(op.get_bind())
+    return any(ix["name"] == name for ix in inspector.get_indexes(table))
+
+
+def upgrade():
+    # Chỉ drop khi khóa unique đã có, để khóa ngoại employee_id luôn có index
+    if _has_index("payrolls", UNIQUE_INDEX) and _has_index("payrolls", OLD_INDEX):
+        op.drop_index(OLD_INDEX, table_name="payrolls")
+
+
+def downgrade():
+    # Sau 0005 index cũ vốn không tồn tại: không cần tạo lại
+    pass
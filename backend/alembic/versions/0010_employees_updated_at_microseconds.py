@@ -0,0 +1,47 @@
+"""employees: updated_at lưu tới micro giây
+
+Revision ID: 0010
+Revises: 0009
+Create Date: 2026-10-18
+
+ETag của danh sách nhân viên dựa trên MAX(updated_at). Với DATETIME (giây),
+2 lần ghi trong cùng 1 giây cho cùng ETag => client nhận 304 với dữ liệu cũ.
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.mysql import DATETIME
+
+revision = "0010"
+down_revision = "0009"
+branch_labels = None
+depends_on = None
+
+
+def _updated_at_fsp():
+    inspector = sa.inspect(op.get_bind())
+    for column in inspector.get_columns("employees"):
+        if column["name"] == "updated_at":
+            return getattr(column["type"], "fsp", None) or 0
+    return None
+
+
+def upgrade():
+    if _updated_at_fsp() == 0:
+        op.alter_column(
+            "employees",
+            "updated_at",
+            type_=DATETIME(fsp=6),
+            existing_type=sa.DateTime(),
+            existing_nullable=True,
+        )
+
+
+def downgrade():
+    if _updated_at_fsp():
+        op.alter_column(
+            "employees",
+            "updated_at",
+            type_=sa.DateTime(),
+            existing_type=DATETIME(fsp=6),
+            existing_nullable=True,
+        )
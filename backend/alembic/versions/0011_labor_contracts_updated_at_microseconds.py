@@ -0,0 +1,48 @@
+"""labor_contracts: updated_at lưu tới micro giây
+
+Revision ID: 0011
+Revises: 0010
+Create Date: 2026-10-18
+
+Snapshot hợp đồng sắp hết hạn so version bằng MAX(updated_at). Với DATETIME
+(giây), 2 lần sửa trong cùng 1 giây sau khi worker khác đã nạp snapshot cho
+cùng version => worker đó giữ snapshot cũ tới lần dựng lại ban đêm.
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.mysql import DATETIME
+
+revision = "0011"
+down_revision = "0010"
+branch_labels = None
+depends_on = None
+
+
+def _updated_at_fsp():
+    inspector = sa.inspect(op.get_bind())
+    for column in inspector.get_columns("labor_contracts"):
+        if column["name"] == "updated_at":
+            return getattr(column["type"], "fsp", None) or 0
+    return None
+
+
+def upgrade():
+    if _updated_at_fsp() == 0:
+        op.alter_column(
+            "labor_contracts",
+            "updated_at",
+            type_=DATETIME(fsp=6),
+            existing_type=sa.DateTime(),
+            existing_nullable=True,
+        )
+
+
+def downgrade():
+    if _updated_at_fsp():
+        op.alter_column(
+            "labor_contracts",
+            "updated_at",
+            type_=sa.DateTime(),
+            existing_type=DATETIME(fsp=6),
+            existing_nullable=True,
+        )
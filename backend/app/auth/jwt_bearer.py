@@ -1,6 +1,6 @@
 from fastapi import Request, HTTPException
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from .jwt_handler import decode_access_token
+from .jwt_handler import decode_access_token_cached
 
 
 class JWTBearer(HTTPBearer):
@@ -11,10 +11,15 @@ class JWTBearer(HTTPBearer):
             raise HTTPException(status_code=403, detail="Không có token")
 
         token = credentials.credentials
-        payload = decode_access_token(token)
+        payload = decode_access_token_cached(token)
 
         if payload is None:
             raise HTTPException(status_code=403, detail="Token không hợp lệ hoặc đã hết hạn")
 
         # trả payload để các dependency khác có thể dùng
         return payload
+
+
+# Dùng chung 1 instance: FastAPI chỉ gọi 1 lần / request cho cùng 1 dependency
+# (router-level dependencies + tham số endpoint không decode token 2 lần)
+jwt_bearer = JWTBearer()
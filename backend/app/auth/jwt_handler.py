@@ -1,6 +1,10 @@
+from collections import OrderedDict
 from datetime import datetime, timedelta
 from jose import jwt, JWTError
+import hashlib
 import os
+import threading
+import time
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -8,6 +12,7 @@ load_dotenv()
 SECRET_KEY = os.getenv("JWT_SECRET", "change_me")
 ALGORITHM = os.getenv("JWT_ALGORITHM", "HS256")
 EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "1440"))  # 1 ngày
+TOKEN_CACHE_SIZE = int(os.getenv("JWT_CACHE_SIZE", "10000"))
 
 
 def create_access_token(data: dict):
@@ -25,3 +30,51 @@ def decode_access_token(token: str):
         return payload
     except JWTError:
         return None
+
+
+# ======================================================
+# CACHE PAYLOAD ĐÃ XÁC THỰC
+# - Key là sha256 của token (không giữ token gốc trong bộ nhớ)
+# - Mỗi mục hết hạn đúng lúc token hết hạn (claim exp)
+# - LRU giới hạn TOKEN_CACHE_SIZE mục
+# ======================================================
+
+class TokenCache:
+    def __init__(self, max_size: int = TOKEN_CACHE_SIZE):
+        self._max_size = max_size
+        self._lock = threading.Lock()
+        self._items = OrderedDict()  # key -> (payload, exp)
+
+    def get(self, key: str):
+        with self._lock:
+            entry = self._items.get(key)
+            if entry is None:
+                return None
+            payload, exp = entry
+            if exp <= time.time():
+                del self._items[key]
+                return None
+            self._items.move_to_end(key)
+            return dict(payload)
+
+    def put(self, key: str, payload: dict, exp: float):
+        with self._lock:
+            self._items[key] = (dict(payload), exp)
+            self._items.move_to_end(key)
+            while len(self._items) > self._max_size:
+                self._items.popitem(last=False)
+
+
+_token_cache = TokenCache()
+
+
+def decode_access_token_cached(token: str):
+    key = hashlib.sha256(token.encode()).hexdigest()
+    payload = _token_cache.get(key)
+    if payload is not None:
+        return payload
+
+    payload = decode_access_token(token)
+    if payload is not None and payload.get("exp"):
+        _token_cache.put(key, payload, float(payload["exp"]))
+    return payload
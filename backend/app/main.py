@@ -13,6 +13,9 @@ from app.routers.rewards_router import router as RewardsRouter
 from app.routers.salary_grades_router import router as SalaryGradesRouter
 from app.routers.timesheets_router import router as TimesheetsRouter
 from app.routers.users_router import router as UsersRouter
+from app.services import contract_expiry, payslips, timesheet_ingest
+from app.services.password_hasher import password_hasher
+from app.services.scheduler import scheduler
 
 Base.metadata.create_all(bind=engine)
 
@@ -28,6 +31,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "Last-Modified"],
 )
 
 # ROUTERS
@@ -43,6 +47,24 @@ app.include_router(TimesheetsRouter)
 app.include_router(UsersRouter)
 
 
+@app.on_event("startup")
+def start_scheduler():
+  scheduler.add_job(
+    "expiring_contracts",
+    contract_expiry.refresh_snapshot,
+    hour=contract_expiry.EXPIRY_SNAPSHOT_HOUR,
+  )
+  scheduler.start()
+
+
+@app.on_event("shutdown")
+def shutdown_workers():
+  scheduler.stop()
+  timesheet_ingest.timesheet_buffer.close()
+  payslips.shutdown()
+  password_hasher.shutdown()
+
+
 @app.get("/")
 def root():
   return {"message": "HR Management API running"}
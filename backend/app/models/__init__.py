@@ -7,3 +7,5 @@ from app.models.labor_contracts import LaborContract
 from app.models.payrolls import Payroll
 from app.models.reward_discipline import RewardDiscipline
 from app.models.timesheets import Timesheet
+from app.models.department_stats import DepartmentStats, DepartmentPayrollStats
+from app.models.timesheet_archive import TimesheetArchive
@@ -0,0 +1,29 @@
+from sqlalchemy import Column, BigInteger, Integer, DECIMAL, DateTime, ForeignKey
+from datetime import datetime
+from app.database import Base
+
+
+# Bảng tổng hợp, được cập nhật tăng dần bởi các luồng ghi nhân viên / bảng lương
+# (app/services/department_stats.py). Sửa lệch bằng: python rebuild_department_stats.py
+class DepartmentStats(Base):
+    __tablename__ = "department_stats"
+
+    department_id = Column(BigInteger, ForeignKey("departments.id"), primary_key=True)
+    headcount_active = Column(Integer, nullable=False, default=0)
+    headcount_inactive = Column(Integer, nullable=False, default=0)
+    headcount_leave = Column(Integer, nullable=False, default=0)
+    # Dùng để tính lương cơ bản trung bình = base_salary_sum / graded_count
+    graded_count = Column(Integer, nullable=False, default=0)
+    base_salary_sum = Column(DECIMAL(16, 2), nullable=False, default=0)
+    updated_at = Column(DateTime, default=datetime.utcnow)
+
+
+class DepartmentPayrollStats(Base):
+    __tablename__ = "department_payroll_stats"
+
+    department_id = Column(BigInteger, ForeignKey("departments.id"), primary_key=True)
+    year = Column(Integer, primary_key=True)
+    month = Column(Integer, primary_key=True)
+    payroll_count = Column(Integer, nullable=False, default=0)
+    payroll_total = Column(DECIMAL(16, 2), nullable=False, default=0)
+    updated_at = Column(DateTime, default=datetime.utcnow)
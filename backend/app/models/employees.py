@@ -1,11 +1,26 @@
-from sqlalchemy import Column, BigInteger, String, Enum, Date, Text, ForeignKey, Boolean, DateTime
+from sqlalchemy import Column, BigInteger, String, Enum, Date, Text, ForeignKey, Boolean, DateTime, Index
 from datetime import datetime
+from sqlalchemy.dialects.mysql import DATETIME
 from sqlalchemy.orm import relationship
 from app.database import Base
 
 
 class Employee(Base):
     __tablename__ = "employees"
+    __table_args__ = (
+        # Tìm kiếm theo tên / mã nhân viên (xem app/utils/search.py)
+        Index(
+            "ft_employees_full_name_code",
+            "full_name",
+            "code",
+            mysql_prefix="FULLTEXT",
+            mysql_with_parser="ngram",
+        ),
+        # Bộ lọc danh sách: deleted + department_id + status, sắp xếp id DESC
+        Index("ix_employees_deleted_department_status_id", "deleted", "department_id", "status", "id"),
+        # MAX(updated_at) cho ETag của danh sách
+        Index("ix_employees_updated_at", "updated_at"),
+    )
 
     id = Column(BigInteger, primary_key=True, index=True)
     code = Column(String(50), unique=True, nullable=False)
@@ -24,7 +39,8 @@ class Employee(Base):
     deleted = Column(Boolean, default=False)
     deleted_at = Column(DateTime)
     created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow)
+    # Độ chính xác micro giây: 2 lần ghi trong cùng 1 giây vẫn đổi ETag danh sách
+    updated_at = Column(DATETIME(fsp=6), default=datetime.utcnow)
 
     department = relationship("Department", back_populates="employees")
     position = relationship("Position", back_populates="employees")
@@ -33,4 +49,8 @@ class Employee(Base):
     contracts = relationship("LaborContract", back_populates="employee")
     payrolls = relationship("Payroll", back_populates="employee")
     rewards = relationship("RewardDiscipline", back_populates="employee")
-    timesheets = relationship("Timesheet", back_populates="employee")
+    timesheets = relationship(
+        "Timesheet",
+        back_populates="employee",
+        primaryjoin="Employee.id == foreign(Timesheet.employee_id)",
+    )
@@ -1,11 +1,17 @@
-from sqlalchemy import Column, BigInteger, String, DECIMAL, Date, Text, DateTime, ForeignKey
+from sqlalchemy import Column, BigInteger, String, DECIMAL, Date, Text, DateTime, ForeignKey, Index
 from datetime import datetime
+from sqlalchemy.dialects.mysql import DATETIME
 from sqlalchemy.orm import relationship
 from app.database import Base
 
 
 class LaborContract(Base):
     __tablename__ = "labor_contracts"
+    __table_args__ = (
+        Index("ix_labor_contracts_employee_end_date", "employee_id", "end_date"),
+        # Lọc hợp đồng sắp hết hạn theo khoảng end_date (không kèm employee_id)
+        Index("ix_labor_contracts_end_date", "end_date"),
+    )
 
     id = Column(BigInteger, primary_key=True, index=True)
     employee_id = Column(BigInteger, ForeignKey("employees.id"))
@@ -14,7 +20,14 @@ class LaborContract(Base):
     start_date = Column(Date, nullable=False)
     end_date = Column(Date)
     file_url = Column(Text)
+    # File scan hợp đồng trong kho nội dung (app/services/contract_files.py)
+    file_sha256 = Column(String(64), index=True)
+    file_size = Column(BigInteger)
+    file_name = Column(String(255))
+    content_type = Column(String(100))
     created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow)
+    # Độ chính xác micro giây: version của snapshot hợp đồng sắp hết hạn
+    # (contract_expiry.data_version) đổi cả khi 2 lần ghi cùng 1 giây
+    updated_at = Column(DATETIME(fsp=6), default=datetime.utcnow)
 
     employee = relationship("Employee", back_populates="contracts")
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, BigInteger, Integer, DECIMAL, DateTime, ForeignKey
+from sqlalchemy import Column, BigInteger, Integer, DECIMAL, DateTime, ForeignKey, Index
 from datetime import datetime
 from sqlalchemy.orm import relationship
 from app.database import Base
@@ -6,6 +6,10 @@ from app.database import Base
 
 class Payroll(Base):
     __tablename__ = "payrolls"
+    __table_args__ = (
+        # Mỗi nhân viên chỉ có 1 bảng lương / tháng (upsert dựa trên khóa này)
+        Index("ux_payrolls_employee_year_month", "employee_id", "year", "month", unique=True),
+    )
 
     id = Column(BigInteger, primary_key=True, index=True)
     employee_id = Column(BigInteger, ForeignKey("employees.id"))
@@ -1,10 +1,13 @@
-from sqlalchemy import Column, BigInteger, String, Enum, DECIMAL, Date, Text, ForeignKey
+from sqlalchemy import Column, BigInteger, String, Enum, DECIMAL, Date, Text, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from app.database import Base
 
 
 class RewardDiscipline(Base):
     __tablename__ = "reward_discipline"
+    __table_args__ = (
+        Index("ix_reward_discipline_employee_date", "employee_id", "date"),
+    )
 
     id = Column(BigInteger, primary_key=True, index=True)
     employee_id = Column(BigInteger, ForeignKey("employees.id"), nullable=False)
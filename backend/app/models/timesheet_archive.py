@@ -0,0 +1,20 @@
+from sqlalchemy import Column, BigInteger, Date, Time, DECIMAL, Index
+from app.database import Base
+
+
+# Chấm công của các năm đã chốt, chuyển khỏi bảng timesheets bởi
+# python manage_timesheet_partitions.py archive <năm>. Cùng cột với Timesheet
+# để đọc chung bằng UNION ALL; nén trang (ROW_FORMAT=COMPRESSED) vì chỉ đọc.
+class TimesheetArchive(Base):
+    __tablename__ = "timesheets_archive"
+    __table_args__ = (
+        Index("ix_timesheets_archive_employee_date", "employee_id", "date"),
+        {"mysql_row_format": "COMPRESSED"},
+    )
+
+    id = Column(BigInteger, primary_key=True, autoincrement=False)
+    employee_id = Column(BigInteger, nullable=False)
+    date = Column(Date, nullable=False)
+    check_in = Column(Time)
+    check_out = Column(Time)
+    working_hours = Column(DECIMAL(5, 2))
@@ -1,16 +1,26 @@
-from sqlalchemy import Column, BigInteger, Date, Time, DECIMAL, ForeignKey
+from sqlalchemy import Column, BigInteger, Date, Time, DECIMAL, Index
 from sqlalchemy.orm import relationship
 from app.database import Base
 
 
+# Khớp với migration 0006: bảng partition theo tháng (RANGE TO_DAYS(date)) nên
+# PK là (id, date) và không có khóa ngoại employee_id (InnoDB không hỗ trợ FK
+# trên bảng partition) - quan hệ với Employee chỉ khai báo ở ORM.
 class Timesheet(Base):
     __tablename__ = "timesheets"
+    __table_args__ = (
+        Index("ix_timesheets_employee_date", "employee_id", "date"),
+    )
 
-    id = Column(BigInteger, primary_key=True, index=True)
-    employee_id = Column(BigInteger, ForeignKey("employees.id"), nullable=False)
-    date = Column(Date, nullable=False)
+    id = Column(BigInteger, primary_key=True, autoincrement=True, index=True)
+    employee_id = Column(BigInteger, nullable=False)
+    date = Column(Date, primary_key=True)
     check_in = Column(Time)
     check_out = Column(Time)
     working_hours = Column(DECIMAL(5, 2))
 
-    employee = relationship("Employee", back_populates="timesheets")
+    employee = relationship(
+        "Employee",
+        back_populates="timesheets",
+        primaryjoin="foreign(Timesheet.employee_id) == Employee.id",
+    )
@@ -1,29 +1,36 @@
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 
 from app.database import get_db
 from app.models.users import User
-from app.schemas.auth import LoginRequest, LoginResponse, LoginUserInfo
+from app.schemas.auth import LoginRequest, LoginResponse, LoginUserInfo, PasswordHashMetrics
 from app.auth.jwt_handler import create_access_token
-from app.auth.jwt_bearer import JWTBearer
-from app.utils.password import verify_password
+from app.auth.jwt_bearer import jwt_bearer
+from app.services.password_hasher import password_hasher
 
 router = APIRouter(
     prefix="/auth",
     tags=["Auth"],
 )
 
-@router.post("/login", response_model=LoginResponse)
-def login(data: LoginRequest, db: Session = Depends(get_db)):
-    user = (
+def _find_login_user(db: Session, email: str):
+    return (
         db.query(User)
         .filter(
-            User.email == data.email,
+            User.email == email,
             User.deleted == False
         )
         .first()
     )
 
+
+# async: truy vấn DB chạy trong threadpool, bcrypt chạy trên executor riêng
+# (app/services/password_hasher.py) => đợt đăng nhập không chiếm threadpool
+@router.post("/login", response_model=LoginResponse)
+async def login(data: LoginRequest, db: Session = Depends(get_db)):
+    user = await run_in_threadpool(_find_login_user, db, data.email)
+
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -36,7 +43,7 @@ def login(data: LoginRequest, db: Session = Depends(get_db)):
             detail="Tài khoản đã bị khóa / không hoạt động",
         )
 
-    if not verify_password(data.password, user.password_hash):
+    if not await password_hasher.verify(data.password, user.password_hash):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Sai email hoặc mật khẩu",
@@ -60,9 +67,9 @@ def login(data: LoginRequest, db: Session = Depends(get_db)):
 
 
 # Lấy thông tin user hiện tại từ token
-@router.get("/me", response_model=LoginUserInfo, dependencies=[Depends(JWTBearer())])
+@router.get("/me", response_model=LoginUserInfo)
 def get_me(
-    payload = Depends(JWTBearer()),
+    payload = Depends(jwt_bearer),
     db: Session = Depends(get_db),
 ):
     """
@@ -83,3 +90,13 @@ def get_me(
         email=user.email,
         role=user.role,
     )
+
+
+# Độ dài hàng đợi / thời gian băm mật khẩu của worker hiện tại
+@router.get(
+    "/password-hash/metrics",
+    response_model=PasswordHashMetrics,
+    dependencies=[Depends(jwt_bearer)],
+)
+async def password_hash_metrics():
+    return password_hasher.metrics()
@@ -1,32 +1,81 @@
+import os
 from datetime import datetime
 from typing import List, Optional
+from urllib.parse import quote
 
-from app.auth.jwt_bearer import JWTBearer
+from app.auth.jwt_bearer import jwt_bearer
 from app.database import get_db
 from app.models.labor_contracts import LaborContract
-from app.schemas.contracts import ContractCreate, ContractResponse, ContractUpdate
-from fastapi import APIRouter, Depends, HTTPException, status
+from app.schemas.contracts import (
+    ContractCreate,
+    ContractFileResponse,
+    ContractResponse,
+    ContractUpdate,
+    EmployeeSmall,
+    ExpiringContractResponse,
+)
+from app.services import contract_files
+from app.services.contract_expiry import expiring_contracts
+from app.utils.fields import Projection
+from app.utils.http_cache import is_not_modified
+from app.utils.http_range import RangeNotSatisfiable, parse_byte_range
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, StreamingResponse
 from sqlalchemy.orm import Session, joinedload
 
 router = APIRouter(
     prefix="/contracts",
     tags=["Contracts"],
-    dependencies=[Depends(JWTBearer())],  # yêu cầu token cho toàn bộ routes trong module
+    dependencies=[Depends(jwt_bearer)],  # yêu cầu token cho toàn bộ routes trong module
+)
+
+
+# ?fields=... : chỉ lấy các cột / quan hệ được yêu cầu
+CONTRACT_PROJECTION = Projection(
+    LaborContract,
+    ContractResponse,
+    relations={"employee": (LaborContract.employee, EmployeeSmall)},
 )
 
 
 @router.get("/", response_model=List[ContractResponse])
-def list_contracts(db: Session = Depends(get_db), employee_id: Optional[int] = None):
-    query = db.query(LaborContract).options(joinedload(LaborContract.employee))
+def list_contracts(
+    db: Session = Depends(get_db),
+    employee_id: Optional[int] = None,
+    fields: Optional[str] = None,
+):
+    selected = CONTRACT_PROJECTION.parse(fields)
+
+    if selected:
+        query = db.query(LaborContract).options(*CONTRACT_PROJECTION.options(selected))
+    else:
+        query = db.query(LaborContract).options(joinedload(LaborContract.employee))
 
     if employee_id:
         query = query.filter(LaborContract.employee_id == employee_id)
 
-    return query.order_by(LaborContract.id.desc()).all()
+    contracts = query.order_by(LaborContract.id.desc()).all()
 
+    if selected:
+        return JSONResponse([CONTRACT_PROJECTION.serialize(c, selected) for c in contracts])
 
-@router.get("/{contract_id}", response_model=ContractResponse)
-def get_contract(contract_id: int, db: Session = Depends(get_db)):
+    return contracts
+
+
+# ======================================================
+# HỢP ĐỒNG SẮP HẾT HẠN (snapshot dựng mỗi đêm, xem app/services/contract_expiry.py)
+# ======================================================
+
+@router.get("/expiring", response_model=List[ExpiringContractResponse])
+def list_expiring_contracts(within_days: int = 30, db: Session = Depends(get_db)):
+    if not 0 <= within_days <= 366:
+        raise HTTPException(400, "within_days phải trong khoảng 0 - 366")
+
+    return expiring_contracts.get(db, within_days)
+
+
+def _get_contract(db: Session, contract_id: int) -> LaborContract:
     contract = db.query(LaborContract).filter(LaborContract.id == contract_id).first()
 
     if not contract:
@@ -35,6 +84,144 @@ def get_contract(contract_id: int, db: Session = Depends(get_db)):
     return contract
 
 
+@router.get("/{contract_id}", response_model=ContractResponse)
+def get_contract(contract_id: int, db: Session = Depends(get_db)):
+    return _get_contract(db, contract_id)
+
+
+# ======================================================
+# FILE HỢP ĐỒNG – upload stream theo chunk vào kho sha256 (dedupe),
+# download hỗ trợ HTTP Range (206)
+# ======================================================
+
+def _attach_file(
+    db: Session,
+    contract_id: int,
+    sha256: str,
+    size: int,
+    file_name: str,
+    content_type: str,
+) -> LaborContract:
+    contract = _get_contract(db, contract_id)
+
+    contract.file_sha256 = sha256
+    contract.file_size = size
+    contract.file_name = file_name
+    contract.content_type = content_type
+    contract.file_url = f"/contracts/{contract_id}/file"
+    contract.updated_at = datetime.utcnow()
+
+    db.commit()
+    db.refresh(contract)
+    expiring_contracts.invalidate()
+
+    return contract
+
+
+def _store_and_attach(
+    db: Session,
+    contract_id: int,
+    sha256: str,
+    size: int,
+    tmp_path: str,
+    file_name: str,
+    content_type: str,
+) -> LaborContract:
+    try:
+        old_sha256 = _get_contract(db, contract_id).file_sha256
+    except HTTPException:
+        contract_files.discard_tmp(tmp_path)  # hợp đồng bị xóa trong lúc upload
+        raise
+
+    try:
+        contract = contract_files.store_blob(
+            db,
+            sha256,
+            tmp_path,
+            lambda: _attach_file(db, contract_id, sha256, size, file_name, content_type),
+        )
+    except contract_files.BlobLockTimeout:
+        contract_files.discard_tmp(tmp_path)
+        raise HTTPException(503, "Kho file đang bận, vui lòng thử lại")
+
+    if old_sha256 and old_sha256 != sha256:
+        contract_files.remove_if_unreferenced(db, old_sha256)
+
+    return contract
+
+
+@router.put("/{contract_id}/file", response_model=ContractFileResponse)
+async def upload_contract_file(
+    contract_id: int,
+    request: Request,
+    filename: Optional[str] = None,
+    db: Session = Depends(get_db),
+):
+    # Body là nội dung file (không dùng multipart), Content-Type là loại file
+    await run_in_threadpool(_get_contract, db, contract_id)
+
+    try:
+        sha256, size, tmp_path = await contract_files.save_stream(request.stream())
+    except contract_files.FileTooLargeError:
+        raise HTTPException(413, "File vượt quá dung lượng cho phép")
+
+    if size == 0:
+        contract_files.discard_tmp(tmp_path)
+        raise HTTPException(400, "File rỗng")
+
+    file_name = os.path.basename(filename or "")[:255] or f"contract_{contract_id}"
+    content_type = request.headers.get("content-type") or "application/octet-stream"
+
+    return await run_in_threadpool(
+        _store_and_attach, db, contract_id, sha256, size, tmp_path, file_name, content_type
+    )
+
+
+@router.get("/{contract_id}/file")
+def download_contract_file(contract_id: int, request: Request, db: Session = Depends(get_db)):
+    contract = _get_contract(db, contract_id)
+
+    path = contract_files.path_for(contract.file_sha256) if contract.file_sha256 else None
+    if not path or not os.path.exists(path):
+        raise HTTPException(404, "Hợp đồng chưa có file")
+
+    size = os.path.getsize(path)
+    etag = f'"{contract.file_sha256}"'  # nội dung xác định bởi hash => ETag mạnh
+    headers = {
+        "Accept-Ranges": "bytes",
+        "ETag": etag,
+        "Content-Disposition": f"attachment; filename*=UTF-8''{quote(contract.file_name or '')}",
+    }
+
+    if is_not_modified(request, etag):
+        return Response(status_code=304, headers=headers)
+
+    range_header = request.headers.get("range")
+    if_range = request.headers.get("if-range")
+    if if_range and if_range.strip() != etag:
+        range_header = None  # file đã đổi: trả về toàn bộ
+
+    try:
+        byte_range = parse_byte_range(range_header, size)
+    except RangeNotSatisfiable:
+        return Response(status_code=416, headers={"Content-Range": f"bytes */{size}"})
+
+    status_code = 200
+    start, end = 0, size - 1
+    if byte_range:
+        start, end = byte_range
+        status_code = 206
+        headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+    headers["Content-Length"] = str(end - start + 1)
+
+    return StreamingResponse(
+        contract_files.iter_file(path, start, end),
+        status_code=status_code,
+        media_type=contract.content_type or "application/octet-stream",
+        headers=headers,
+    )
+
+
 @router.post("/", response_model=ContractResponse, status_code=201)
 def create_contract(data: ContractCreate, db: Session = Depends(get_db)):
     contract = LaborContract(**data.dict())
@@ -42,6 +229,7 @@ def create_contract(data: ContractCreate, db: Session = Depends(get_db)):
     db.add(contract)
     db.commit()
     db.refresh(contract)
+    expiring_contracts.invalidate()
 
     return contract
 
@@ -60,6 +248,7 @@ def update_contract(contract_id: int, data: ContractUpdate, db: Session = Depend
 
     db.commit()
     db.refresh(contract)
+    expiring_contracts.invalidate()
 
     return contract
 
@@ -71,7 +260,11 @@ def delete_contract(contract_id: int, db: Session = Depends(get_db)):
     if not contract:
         raise HTTPException(404, "Không tìm thấy hợp đồng")
 
+    file_sha256 = contract.file_sha256
+
     db.delete(contract)
     db.commit()
+    expiring_contracts.invalidate()
+    contract_files.remove_if_unreferenced(db, file_sha256)
 
     return
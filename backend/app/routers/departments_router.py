@@ -1,89 +1,212 @@
+from collections import defaultdict
 from datetime import datetime
 from typing import List, Optional
 
-from app.auth.jwt_bearer import JWTBearer
+from app.auth.jwt_bearer import jwt_bearer
 from app.database import get_db
+from app.models.department_stats import DepartmentPayrollStats, DepartmentStats
 from app.models.departments import Department
 from app.models.employees import Employee
 from app.schemas.departments import (
     DepartmentCreate,
     DepartmentResponse,
+    DepartmentStatsResponse,
     DepartmentUpdate,
 )
-from fastapi import APIRouter, Depends, HTTPException, status
+from app.services.reference_cache import (
+    content_digest,
+    departments_cache,
+    paginate,
+    search_items,
+)
+from app.utils.http_cache import latest, make_etag, not_modified
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 from sqlalchemy.orm import Session
 
 router = APIRouter(
     prefix="/departments",
     tags=["Departments"],
-    dependencies=[Depends(JWTBearer())]
+    dependencies=[Depends(jwt_bearer)]
 )
 
 
-def map_department_with_manager(dept: Department, db: Session):
-    manager_name = None
-    if dept.manager_id:
-        emp = db.query(Employee).filter(Employee.id == dept.manager_id).first()
-        manager_name = emp.full_name if emp else None
+def _with_live_fields(db: Session, items: List[dict]) -> List[dict]:
+    """
+    Gắn số nhân viên (bảng tổng hợp department_stats) và tên trưởng phòng cho
+    các phòng ban lấy từ cache. Hai giá trị này đổi theo mỗi lần ghi nhân viên
+    nên không nằm trong cache danh mục; mỗi loại 1 truy vấn IN theo khóa chính.
+    """
+    department_ids = {item["id"] for item in items}
+    manager_ids = {item["manager_id"] for item in items if item["manager_id"]}
 
-    return {
-        "id": dept.id,
-        "name": dept.name,
-        "description": dept.description,
-        "phone": dept.phone,
-        "manager_id": dept.manager_id,
-        "manager_name": manager_name,
-        "deleted": dept.deleted,
-        "created_at": dept.created_at,
-        "updated_at": dept.updated_at,
-    }
+    stats = {
+        row.department_id: row
+        for row in db.query(DepartmentStats).filter(
+            DepartmentStats.department_id.in_(department_ids)
+        )
+    } if department_ids else {}
+    managers = {
+        row.id: row
+        for row in db.query(Employee.id, Employee.full_name, Employee.updated_at).filter(
+            Employee.id.in_(manager_ids)
+        )
+    } if manager_ids else {}
+
+    results = []
+    for item in items:
+        item_stats = stats.get(item["id"])
+        manager = managers.get(item["manager_id"])
+        results.append({
+            **item,
+            "headcount": (
+                item_stats.headcount_active
+                + item_stats.headcount_inactive
+                + item_stats.headcount_leave
+            ) if item_stats else 0,
+            "stats_updated_at": item_stats.updated_at if item_stats else None,
+            "manager_name": manager.full_name if manager else None,
+            "manager_updated_at": manager.updated_at if manager else None,
+        })
+    return results
+
+
+def _get_department(db: Session, department_id: int) -> dict:
+    item = departments_cache.get(db, department_id)
+
+    if not item:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Không tìm thấy phòng ban",
+        )
+
+    return _with_live_fields(db, [item])[0]
 
 
 @router.get("/", response_model=List[DepartmentResponse])
 def list_departments(
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db),
     search: Optional[str] = None,
     page: int = 1,
     page_size: int = 50,
 ):
-    query = db.query(Department).filter(Department.deleted == False)
-
-    if search:
-        like_value = f"%{search}%"
-        query = query.filter(Department.name.like(like_value))
-
     if page < 1:
         page = 1
     if page_size <= 0:
         page_size = 50
 
-    skip = (page - 1) * page_size
+    # Danh sách lấy từ cache danh mục + số liệu sống của trang hiện tại; ETag
+    # theo nội dung đã render nên 304 không bao giờ trả về dữ liệu cũ
+    items = search_items(departments_cache.all(db), "name", search)
+    items = _with_live_fields(db, paginate(items, page, page_size))
 
-    departments = (
-        query.order_by(Department.id.desc()).offset(skip).limit(page_size).all()
+    cached = not_modified(
+        request,
+        response,
+        make_etag("departments", request.url.query, content_digest(items)),
     )
+    if cached:
+        return cached
 
-    return [map_department_with_manager(dept, db) for dept in departments]
+    return items
 
 
-@router.get("/{department_id}", response_model=DepartmentResponse)
-def get_department(
+# ======================================================
+# THỐNG KÊ PHÒNG BAN (đọc từ bảng tổng hợp department_stats)
+# ======================================================
+
+def _department_stats(db: Session, year: Optional[int], department_id: Optional[int] = None):
+    year = year or datetime.utcnow().year
+
+    query = (
+        db.query(Department.id, Department.name, DepartmentStats)
+        .outerjoin(DepartmentStats, DepartmentStats.department_id == Department.id)
+        .filter(Department.deleted == False)
+    )
+    payroll_query = db.query(DepartmentPayrollStats).filter(DepartmentPayrollStats.year == year)
+
+    if department_id:
+        query = query.filter(Department.id == department_id)
+        payroll_query = payroll_query.filter(DepartmentPayrollStats.department_id == department_id)
+
+    payroll_by_department = defaultdict(list)
+    for item in payroll_query.order_by(DepartmentPayrollStats.month):
+        payroll_by_department[item.department_id].append({
+            "year": item.year,
+            "month": item.month,
+            "payroll_count": item.payroll_count,
+            "payroll_total": item.payroll_total,
+        })
+
+    results = []
+    for dept_id, dept_name, stats in query.order_by(Department.id.desc()):
+        item = {
+            "department_id": dept_id,
+            "department_name": dept_name,
+            "payroll": payroll_by_department.get(dept_id, []),
+        }
+        if stats:
+            item.update({
+                "headcount_active": stats.headcount_active,
+                "headcount_inactive": stats.headcount_inactive,
+                "headcount_leave": stats.headcount_leave,
+                "headcount_total": (
+                    stats.headcount_active + stats.headcount_inactive + stats.headcount_leave
+                ),
+                "avg_base_salary": (
+                    stats.base_salary_sum / stats.graded_count if stats.graded_count else None
+                ),
+            })
+        results.append(item)
+
+    return results
+
+
+@router.get("/stats", response_model=List[DepartmentStatsResponse])
+def list_department_stats(
+    year: Optional[int] = None,
+    db: Session = Depends(get_db),
+):
+    return _department_stats(db, year)
+
+
+@router.get("/{department_id}/stats", response_model=DepartmentStatsResponse)
+def get_department_stats(
     department_id: int,
+    year: Optional[int] = None,
     db: Session = Depends(get_db),
 ):
-    dept = (
-        db.query(Department)
-        .filter(Department.id == department_id, Department.deleted == False)
-        .first()
-    )
+    results = _department_stats(db, year, department_id)
 
-    if not dept:
+    if not results:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Không tìm thấy phòng ban",
         )
 
-    return map_department_with_manager(dept, db)
+    return results[0]
+
+
+@router.get("/{department_id}", response_model=DepartmentResponse)
+def get_department(
+    department_id: int,
+    request: Request,
+    response: Response,
+    db: Session = Depends(get_db),
+):
+    item = _get_department(db, department_id)
+
+    cached = not_modified(
+        request,
+        response,
+        make_etag("department", content_digest(item)),
+        latest(item["updated_at"], item["manager_updated_at"], item["stats_updated_at"]),
+    )
+    if cached:
+        return cached
+
+    return item
 
 
 @router.post("/", response_model=DepartmentResponse, status_code=status.HTTP_201_CREATED)
@@ -112,8 +235,9 @@ def create_department(
     db.add(dept)
     db.commit()
     db.refresh(dept)
+    departments_cache.invalidate()
 
-    return map_department_with_manager(dept, db)
+    return _get_department(db, dept.id)
 
 
 @router.put("/{department_id}", response_model=DepartmentResponse)
@@ -159,8 +283,9 @@ def update_department(
 
     db.commit()
     db.refresh(dept)
+    departments_cache.invalidate()
 
-    return map_department_with_manager(dept, db)
+    return _get_department(db, dept.id)
 
 
 @router.delete("/{department_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -182,6 +307,9 @@ def delete_department(
 
     dept.deleted = True
     dept.deleted_at = datetime.utcnow()
+    # Bump updated_at để ETag của danh sách thay đổi theo
+    dept.updated_at = dept.deleted_at
 
     db.commit()
+    departments_cache.invalidate()
     return
@@ -1,121 +1,380 @@
+import csv
+import io
+import json
 from datetime import datetime
 from typing import List, Optional
 
-from app.auth.jwt_bearer import JWTBearer
-from app.database import get_db
+from app.auth.jwt_bearer import jwt_bearer
+from app.database import SessionLocal, get_db
+from app.models.departments import Department
 from app.models.employees import Employee
-from app.schemas.common import PaginatedResponse
-from app.schemas.employees import EmployeeCreate, EmployeeResponse, EmployeeUpdate
-from fastapi import APIRouter, Depends, HTTPException, status
+from app.models.labor_contracts import LaborContract
+from app.models.payrolls import Payroll
+from app.models.positions import Position
+from app.models.reward_discipline import RewardDiscipline
+from app.models.salary_grades import SalaryGrade
+from app.models.timesheets import Timesheet
+from app.schemas.common import BulkActionResult, PaginatedResponse
+from app.schemas.employee_overview import EmployeeOverview
+from app.schemas.employees import (
+    DepartmentInfo,
+    EmployeeBulkSelection,
+    EmployeeBulkUpdate,
+    EmployeeCreate,
+    EmployeeImportResult,
+    EmployeeResponse,
+    EmployeeUpdate,
+    PositionInfo,
+    SalaryGradeInfo,
+)
+from app.services import department_stats
+from app.services.reference_cache import departments_cache, positions_cache, salary_grades_cache
+from app.utils.fields import Projection
+from app.utils.http_cache import latest, make_etag, not_modified
+from app.utils.pagination import decode_cursor, next_cursor_for
+from app.utils.search import fulltext_search
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, StreamingResponse
+from pydantic import ValidationError
+from sqlalchemy import func, insert, select
+from sqlalchemy.exc import DBAPIError, IntegrityError
 from sqlalchemy.orm import Session, joinedload
 
 router = APIRouter(
     prefix="/employees",
     tags=["Employees"],
-    dependencies=[Depends(JWTBearer())]
+    dependencies=[Depends(jwt_bearer)]
 )
 
 
+def _apply_employee_filters(
+    query,
+    search: Optional[str],
+    department_id: Optional[int],
+    status_filter: Optional[str],
+):
+    """
+    Áp bộ lọc chung cho các endpoint danh sách (Query ORM hoặc select Core).
+    Trả về (query, score): score là điểm FULLTEXT để sắp xếp theo mức độ liên
+    quan, None nếu không tìm kiếm theo từ khóa.
+    """
+    query = query.filter(Employee.deleted == False)
+    score = None
+
+    if search:
+        criterion, score = fulltext_search(search, Employee.full_name, Employee.code)
+        if criterion is not None:
+            query = query.filter(criterion)
+
+    if department_id:
+        query = query.filter(Employee.department_id == department_id)
+
+    if status_filter:
+        query = query.filter(Employee.status == status_filter)
+
+    return query, score
+
+
+# ?fields=... : chỉ lấy các cột / quan hệ được yêu cầu
+EMPLOYEE_PROJECTION = Projection(
+    Employee,
+    EmployeeResponse,
+    relations={
+        "department": (Employee.department, DepartmentInfo),
+        "position": (Employee.position, PositionInfo),
+        "salary_grade": (Employee.salary_grade, SalaryGradeInfo),
+    },
+)
+
+
+def _employee_list_query(
+    db: Session,
+    search: Optional[str],
+    department_id: Optional[int],
+    status_filter: Optional[str],
+    selected: Optional[List[str]] = None,
+):
+    # Không fields: không JOIN danh mục, tên được gắn từ cache (_with_references)
+    query = db.query(Employee)
+    if selected:
+        query = query.options(*EMPLOYEE_PROJECTION.options(selected))
+
+    return _apply_employee_filters(query, search, department_id, status_filter)
+
+
+EMPLOYEE_COLUMNS = [
+    name for name in EmployeeResponse.__fields__ if name not in EMPLOYEE_PROJECTION.relations
+]
+
+
+def _with_references(db: Session, employees: list) -> list:
+    """Gắn department / position / salary_grade từ cache danh mục thay cho JOIN."""
+    departments = departments_cache.lookup(db)
+    positions = positions_cache.lookup(db)
+    grades = salary_grades_cache.lookup(db)
+
+    return [
+        {
+            **{name: getattr(emp, name) for name in EMPLOYEE_COLUMNS},
+            "department": departments.get(emp.department_id),
+            "position": positions.get(emp.position_id),
+            "salary_grade": grades.get(emp.salary_grade_id),
+        }
+        for emp in employees
+    ]
+
+
+def _employee_list_version(db: Session):
+    """
+    Phiên bản dữ liệu cho ETag của danh sách: MAX(updated_at) của nhân viên
+    (DATETIME(6), đi theo index => O(1); xóa mềm cũng cập nhật updated_at nên
+    không cần COUNT) + digest nội dung của các cache danh mục dùng để gắn tên.
+    """
+    return (
+        db.query(func.max(Employee.updated_at)).scalar(),
+        departments_cache.digest(db),
+        positions_cache.digest(db),
+        salary_grades_cache.digest(db),
+    )
+
+
+def _ranked(query, score):
+    if score is not None:
+        return query.order_by(score.desc(), Employee.id.desc())
+    return query.order_by(Employee.id.desc())
+
+
 @router.get("/", response_model=List[EmployeeResponse])
 def list_employees(
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db),
     search: Optional[str] = None,
     department_id: Optional[int] = None,
     status_filter: Optional[str] = None,
+    fields: Optional[str] = None,
 ):
-    query = (
-        db.query(Employee)
-        .filter(Employee.deleted == False)
-        .options(
-            joinedload(Employee.department),
-            joinedload(Employee.position),
-            joinedload(Employee.salary_grade),
-        )
+    version = _employee_list_version(db)
+    cached = not_modified(
+        request,
+        response,
+        make_etag("employees", request.url.query, *version),
     )
+    if cached:
+        return cached
 
-    if search:
-        like_value = f"%{search}%"
-        query = query.filter(
-            (Employee.full_name.ilike(like_value)) |
-            (Employee.code.ilike(like_value))
-        )
+    selected = EMPLOYEE_PROJECTION.parse(fields)
+    query, score = _employee_list_query(db, search, department_id, status_filter, selected)
+    employees = _ranked(query, score).all()
 
-    if department_id:
-        query = query.filter(Employee.department_id == department_id)
-
-    if status_filter:
-        query = query.filter(Employee.status == status_filter)
+    if selected:
+        return JSONResponse(
+            [EMPLOYEE_PROJECTION.serialize(emp, selected) for emp in employees],
+            headers=dict(response.headers),
+        )
 
-    return query.order_by(Employee.id.desc()).all()
+    return _with_references(db, employees)
 
 
 # ======================================================
 # ENDPOINT MỚI – CÓ PHÂN TRANG (DÙNG CHO LIST PAGE)
+# - page/page_size: phân trang theo số trang (UI dùng)
+# - cursor: phân trang keyset theo (id DESC), không OFFSET, không COUNT
+#   => độ sâu trang không còn ảnh hưởng tới thời gian truy vấn
+# Khi có search: chế độ page sắp theo độ liên quan, chế độ cursor giữ id DESC
 # ======================================================
 
 @router.get("/paged", response_model=PaginatedResponse[EmployeeResponse])
 def list_employees_paged(
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db),
     search: Optional[str] = None,
     department_id: Optional[int] = None,
     status_filter: Optional[str] = None,
     page: int = 1,
     page_size: int = 10,
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
 ):
-    query = (
-        db.query(Employee)
-        .filter(Employee.deleted == False)
-        .options(
-            joinedload(Employee.department),
-            joinedload(Employee.position),
-            joinedload(Employee.salary_grade),
-        )
+    version = _employee_list_version(db)
+    cached = not_modified(
+        request,
+        response,
+        make_etag("employees/paged", request.url.query, *version),
     )
+    if cached:
+        return cached
 
-    if search:
-        like_value = f"%{search}%"
-        query = query.filter(
-            (Employee.full_name.ilike(like_value)) |
-            (Employee.code.ilike(like_value))
-        )
-
-    if department_id:
-        query = query.filter(Employee.department_id == department_id)
-
-    if status_filter:
-        query = query.filter(Employee.status == status_filter)
-
-    total = query.count()
+    selected = EMPLOYEE_PROJECTION.parse(fields)
+    query, score = _employee_list_query(db, search, department_id, status_filter, selected)
 
     if page < 1:
         page = 1
     if page_size <= 0:
         page_size = 10
 
-    skip = (page - 1) * page_size
-
-    employees = (
-        query
-        .order_by(Employee.id.desc())
-        .offset(skip)
-        .limit(page_size)
-        .all()
-    )
-
-    return {
+    if cursor:
+        last_id = decode_cursor(cursor)
+        total = None
+        page = None
+        query = query.filter(Employee.id < last_id).order_by(Employee.id.desc())
+    else:
+        total = query.count()
+        query = _ranked(query, score).offset((page - 1) * page_size)
+
+    # Lấy dư 1 bản ghi để biết còn trang sau hay không
+    employees = query.limit(page_size + 1).all()
+    has_more = len(employees) > page_size
+    employees = employees[:page_size]
+
+    result = {
         "items": employees,
         "total": total,
         "page": page,
         "page_size": page_size,
+        # Trang sắp theo điểm liên quan: cursor theo id sẽ bỏ sót / lặp bản ghi
+        "next_cursor": next_cursor_for(employees, has_more) if cursor or score is None else None,
     }
 
+    if selected:
+        result["items"] = [EMPLOYEE_PROJECTION.serialize(emp, selected) for emp in employees]
+        return JSONResponse(result, headers=dict(response.headers))
+
+    result["items"] = _with_references(db, employees)
+    return result
+
+
+# ======================================================
+# EXPORT CSV / NDJSON (STREAMING)
+# - Dùng select Core + server-side cursor (stream_results/yield_per):
+#   không dựng ORM object / Pydantic model, bộ nhớ không tăng theo số dòng
+# - Session riêng vì generator chạy sau khi handler đã trả về
+# ======================================================
+
+EXPORT_BATCH_SIZE = 1000
+
+EXPORT_COLUMNS = (
+    Employee.id,
+    Employee.code,
+    Employee.full_name,
+    Employee.gender,
+    Employee.dob,
+    Employee.email,
+    Employee.phone,
+    Employee.address,
+    Employee.hire_date,
+    Employee.status,
+    Department.name.label("department"),
+    Position.name.label("position"),
+    SalaryGrade.grade_name.label("salary_grade"),
+)
+
+EXPORT_MEDIA_TYPES = {
+    "csv": "text/csv; charset=utf-8",
+    "ndjson": "application/x-ndjson",
+}
+
+
+def _stream_employees(stmt, export_format: str):
+    db = SessionLocal()
+    try:
+        result = db.execute(
+            stmt.execution_options(stream_results=True, yield_per=EXPORT_BATCH_SIZE)
+        )
+
+        if export_format == "csv":
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            writer.writerow(result.keys())
+            yield buffer.getvalue()
+
+            for rows in result.partitions():
+                buffer.seek(0)
+                buffer.truncate(0)
+                writer.writerows(rows)
+                yield buffer.getvalue()
+        else:
+            for rows in result.partitions():
+                yield "".join(
+                    json.dumps(dict(row._mapping), default=str, ensure_ascii=False) + "\n"
+                    for row in rows
+                )
+    finally:
+        db.close()
+
+
+@router.get("/export")
+def export_employees(
+    format: str = "csv",
+    search: Optional[str] = None,
+    department_id: Optional[int] = None,
+    status_filter: Optional[str] = None,
+):
+    if format not in EXPORT_MEDIA_TYPES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Định dạng export không hỗ trợ (csv | ndjson)",
+        )
+
+    stmt = (
+        select(*EXPORT_COLUMNS)
+        .select_from(Employee)
+        .outerjoin(Department, Employee.department_id == Department.id)
+        .outerjoin(Position, Employee.position_id == Position.id)
+        .outerjoin(SalaryGrade, Employee.salary_grade_id == SalaryGrade.id)
+    )
+    stmt, _ = _apply_employee_filters(stmt, search, department_id, status_filter)
+    stmt = stmt.order_by(Employee.id.desc())
+
+    return StreamingResponse(
+        _stream_employees(stmt, format),
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={
+            "Content-Disposition": f'attachment; filename="employees.{format}"',
+        },
+    )
+
 
 # ======================================================
 # GET DETAIL
 # ======================================================
 
 @router.get("/{employee_id}", response_model=EmployeeResponse)
-def get_employee(employee_id: int, db: Session = Depends(get_db)):
+def get_employee(
+    employee_id: int,
+    request: Request,
+    response: Response,
+    db: Session = Depends(get_db),
+):
+    # Kiểm tra ETag bằng truy vấn nhẹ theo khóa chính trước khi join đầy đủ
+    version = (
+        db.query(
+            Employee.updated_at,
+            Department.updated_at,
+            Position.updated_at,
+            SalaryGrade.updated_at,
+        )
+        .outerjoin(Department, Employee.department_id == Department.id)
+        .outerjoin(Position, Employee.position_id == Position.id)
+        .outerjoin(SalaryGrade, Employee.salary_grade_id == SalaryGrade.id)
+        .filter(Employee.id == employee_id, Employee.deleted == False)
+        .first()
+    )
+
+    if not version:
+        raise HTTPException(status_code=404, detail="Không tìm thấy nhân viên")
+
+    cached = not_modified(
+        request,
+        response,
+        make_etag("employee", employee_id, *version),
+        latest(*version),
+    )
+    if cached:
+        return cached
+
     emp = (
         db.query(Employee)
         .options(
@@ -133,6 +392,78 @@ def get_employee(employee_id: int, db: Session = Depends(get_db)):
     return emp
 
 
+# ======================================================
+# EMPLOYEE 360 – dữ liệu cho trang hồ sơ trong 1 request
+# - selectinload không giới hạn được số dòng cho từng nhân viên, nên mỗi
+#   quan hệ là 1 truy vấn có LIMIT riêng: tổng cộng 5 truy vấn cố định
+# ======================================================
+
+OVERVIEW_MAX_LIMIT = 100
+
+
+@router.get("/{employee_id}/overview", response_model=EmployeeOverview)
+def get_employee_overview(
+    employee_id: int,
+    limit: int = 10,
+    db: Session = Depends(get_db),
+):
+    if limit < 1:
+        limit = 10
+    limit = min(limit, OVERVIEW_MAX_LIMIT)
+
+    emp = (
+        db.query(Employee)
+        .options(
+            joinedload(Employee.department),
+            joinedload(Employee.position),
+            joinedload(Employee.salary_grade),
+        )
+        .filter(Employee.id == employee_id, Employee.deleted == False)
+        .first()
+    )
+
+    if not emp:
+        raise HTTPException(status_code=404, detail="Không tìm thấy nhân viên")
+
+    # employee của hợp đồng / bảng lương lấy từ identity map, không phát sinh truy vấn
+    contracts = (
+        db.query(LaborContract)
+        .filter(LaborContract.employee_id == employee_id)
+        .order_by(LaborContract.start_date.desc(), LaborContract.id.desc())
+        .limit(limit)
+        .all()
+    )
+    payrolls = (
+        db.query(Payroll)
+        .filter(Payroll.employee_id == employee_id)
+        .order_by(Payroll.year.desc(), Payroll.month.desc())
+        .limit(limit)
+        .all()
+    )
+    rewards = (
+        db.query(RewardDiscipline)
+        .filter(RewardDiscipline.employee_id == employee_id)
+        .order_by(RewardDiscipline.date.desc())
+        .limit(limit)
+        .all()
+    )
+    timesheets = (
+        db.query(Timesheet)
+        .filter(Timesheet.employee_id == employee_id)
+        .order_by(Timesheet.date.desc())
+        .limit(limit)
+        .all()
+    )
+
+    return {
+        "employee": emp,
+        "contracts": contracts,
+        "payrolls": payrolls,
+        "rewards": rewards,
+        "timesheets": timesheets,
+    }
+
+
 # ======================================================
 # CREATE
 # ======================================================
@@ -153,12 +484,284 @@ def create_employee(
     emp.status = data.status or "active"
 
     db.add(emp)
+    department_stats.apply_employee_change(db, None, department_stats.employee_snapshot(emp))
     db.commit()
     db.refresh(emp)
 
     return emp
 
 
+# ======================================================
+# BULK IMPORT (CSV hoặc JSON array)
+# - Validate từng dòng bằng EmployeeCreate, lỗi trả về theo dòng
+# - Kiểm tra trùng mã cho cả lô bằng 1 truy vấn IN
+# - Ghi các dòng hợp lệ bằng insert() executemany theo chunk, 1 transaction
+# ======================================================
+
+IMPORT_CHUNK_SIZE = 1000
+# Khóa chứa các ô thừa của dòng CSV dài hơn header (mặc định DictReader dùng None)
+CSV_EXTRA_KEY = "__extra__"
+# Độ dài tối đa của các cột chuỗi (String(n)) => báo lỗi theo dòng thay vì
+# để MySQL ném lỗi 1406 (DataError) làm hỏng cả lần import
+IMPORT_MAX_LENGTHS = {
+    column.name: column.type.length
+    for column in Employee.__table__.columns
+    if getattr(column.type, "length", None)
+}
+
+
+def _parse_import_rows(body: bytes, content_type: str) -> list:
+    try:
+        if "csv" in content_type:
+            reader = csv.DictReader(
+                io.StringIO(body.decode("utf-8-sig")), restkey=CSV_EXTRA_KEY
+            )
+            # Ô trống trong CSV coi như không nhập
+            return [
+                {key: (value if value != "" else None) for key, value in row.items()}
+                for row in reader
+            ]
+
+        rows = json.loads(body)
+    except (UnicodeDecodeError, ValueError, csv.Error):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Không đọc được dữ liệu import",
+        )
+
+    if not isinstance(rows, list):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Dữ liệu JSON phải là một mảng nhân viên",
+        )
+
+    return rows
+
+
+def _existing_ids(db: Session, column, ids: set) -> set:
+    if not ids:
+        return set()
+    return {value for (value,) in db.query(column).filter(column.in_(ids))}
+
+
+def _import_employees(db: Session, rows: list) -> dict:
+    errors = {}
+    valid = []
+
+    def add_error(row_no, code, message):
+        errors.setdefault(row_no, {"row": row_no, "code": code, "errors": []})
+        errors[row_no]["errors"].append(message)
+
+    genders = set(Employee.gender.type.enums)
+    statuses = set(Employee.status.type.enums)
+
+    for row_no, raw in enumerate(rows, start=1):
+        if not isinstance(raw, dict):
+            add_error(row_no, None, "Dòng dữ liệu phải là một object")
+            continue
+
+        extra = raw.get(CSV_EXTRA_KEY)
+        if extra is not None:
+            add_error(row_no, raw.get("code"), f"Dòng có nhiều cột hơn header ({len(extra)} ô thừa)")
+            continue
+
+        try:
+            item = EmployeeCreate(**raw)
+        except ValidationError as exc:
+            for err in exc.errors():
+                field = ".".join(str(part) for part in err["loc"])
+                add_error(row_no, raw.get("code"), f"{field}: {err['msg']}")
+            continue
+
+        if item.gender not in genders:
+            add_error(row_no, item.code, f"gender: giá trị không hợp lệ ({item.gender})")
+        if item.status and item.status not in statuses:
+            add_error(row_no, item.code, f"status: giá trị không hợp lệ ({item.status})")
+        for field, max_length in IMPORT_MAX_LENGTHS.items():
+            value = getattr(item, field, None)
+            if isinstance(value, str) and len(value) > max_length:
+                add_error(row_no, item.code, f"{field}: dài quá {max_length} ký tự")
+
+        if row_no not in errors:
+            valid.append((row_no, item))
+
+    # Trùng mã trong chính file import
+    seen_codes = {}
+    for row_no, item in valid:
+        if item.code in seen_codes:
+            add_error(row_no, item.code, f"Mã nhân viên trùng với dòng {seen_codes[item.code]}")
+        else:
+            seen_codes[item.code] = row_no
+
+    # Trùng mã với dữ liệu đã có + khóa ngoại không tồn tại: mỗi loại 1 truy vấn IN
+    existing_codes = _existing_ids(db, Employee.code, set(seen_codes))
+    references = {
+        "department_id": _existing_ids(
+            db, Department.id, {item.department_id for _, item in valid if item.department_id}
+        ),
+        "position_id": _existing_ids(
+            db, Position.id, {item.position_id for _, item in valid if item.position_id}
+        ),
+        "salary_grade_id": _existing_ids(
+            db, SalaryGrade.id, {item.salary_grade_id for _, item in valid if item.salary_grade_id}
+        ),
+    }
+
+    for row_no, item in valid:
+        if item.code in existing_codes:
+            add_error(row_no, item.code, "Mã nhân viên đã tồn tại")
+        for field, known_ids in references.items():
+            value = getattr(item, field)
+            if value and value not in known_ids:
+                add_error(row_no, item.code, f"{field}: không tồn tại ({value})")
+
+    values = []
+    for row_no, item in valid:
+        if row_no in errors:
+            continue
+        data = item.dict()
+        data["status"] = item.status or "active"
+        values.append(data)
+
+    try:
+        for start in range(0, len(values), IMPORT_CHUNK_SIZE):
+            db.execute(insert(Employee), values[start:start + IMPORT_CHUNK_SIZE])
+        department_stats.rebuild_department_stats(db, {v["department_id"] for v in values})
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Dữ liệu import bị xung đột khi ghi, không có dòng nào được lưu",
+        )
+    except DBAPIError:
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Dữ liệu import không ghi được vào DB, không có dòng nào được lưu",
+        )
+
+    return {
+        "inserted": len(values),
+        "failed": len(errors),
+        "errors": [errors[row_no] for row_no in sorted(errors)],
+    }
+
+
+@router.post("/bulk", response_model=EmployeeImportResult)
+async def bulk_import_employees(
+    request: Request,
+    db: Session = Depends(get_db),
+):
+    body = await request.body()
+    rows = _parse_import_rows(body, request.headers.get("content-type", ""))
+
+    # Phần validate + ghi DB là code đồng bộ, không chạy trên event loop
+    return await run_in_threadpool(_import_employees, db, rows)
+
+
+# ======================================================
+# BULK UPDATE / BULK SOFT DELETE
+# - 1 câu UPDATE set-based cho cả tập nhân viên (theo ids và/hoặc bộ lọc)
+# ======================================================
+
+def _bulk_selection_query(db: Session, selection: EmployeeBulkSelection):
+    criteria = selection.filter.dict(exclude_none=True) if selection.filter else {}
+    if not selection.ids and not criteria:
+        # Không cho phép cập nhật / xóa toàn bộ bảng do thiếu điều kiện
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Cần truyền ids hoặc filter",
+        )
+
+    query, _ = _apply_employee_filters(
+        db.query(Employee),
+        criteria.get("search"),
+        criteria.get("department_id"),
+        criteria.get("status_filter"),
+    )
+
+    if selection.ids:
+        query = query.filter(Employee.id.in_(selection.ids))
+
+    return query
+
+
+def _selected_departments(query) -> set:
+    # Phòng ban bị ảnh hưởng, để tính lại department_stats sau khi UPDATE
+    return {
+        department_id
+        for (department_id,) in query.with_entities(Employee.department_id).distinct()
+    }
+
+
+@router.patch("/bulk", response_model=BulkActionResult)
+def bulk_update_employees(
+    data: EmployeeBulkUpdate,
+    db: Session = Depends(get_db),
+):
+    values = data.changes.dict(exclude_unset=True)
+    if not values:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Không có trường nào để cập nhật",
+        )
+
+    if values.get("status") is not None and values["status"] not in Employee.status.type.enums:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Trạng thái không hợp lệ",
+        )
+
+    # Khóa ngoại không tồn tại: báo 400 thay vì để MySQL ném IntegrityError
+    references = {
+        "department_id": Department.id,
+        "position_id": Position.id,
+        "salary_grade_id": SalaryGrade.id,
+    }
+    for field, column in references.items():
+        value = values.get(field)
+        if value is not None and not _existing_ids(db, column, {value}):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"{field}: không tồn tại ({value})",
+            )
+
+    values["updated_at"] = datetime.utcnow()
+
+    query = _bulk_selection_query(db, data)
+    departments = _selected_departments(query)
+    departments.add(values.get("department_id"))
+
+    affected = query.update(values, synchronize_session=False)
+    department_stats.rebuild_department_stats(db, departments)
+    if "department_id" in values:
+        department_stats.rebuild_payroll_stats(db, department_ids=departments)
+    db.commit()
+
+    return {"affected": affected}
+
+
+@router.delete("/bulk", response_model=BulkActionResult)
+def bulk_delete_employees(
+    data: EmployeeBulkSelection,
+    db: Session = Depends(get_db),
+):
+    now = datetime.utcnow()
+
+    query = _bulk_selection_query(db, data)
+    departments = _selected_departments(query)
+
+    affected = query.update(
+        {"deleted": True, "deleted_at": now, "updated_at": now},
+        synchronize_session=False,
+    )
+    department_stats.rebuild_department_stats(db, departments)
+    db.commit()
+
+    return {"affected": affected}
+
+
 # ======================================================
 # UPDATE
 # ======================================================
@@ -169,18 +772,31 @@ def update_employee(
     data: EmployeeUpdate,
     db: Session = Depends(get_db),
 ):
+    # Khóa dòng: snapshot "trước" phải khớp với lần ghi, nếu không 2 request
+    # đồng thời cùng trừ vào trạng thái / phòng ban cũ và bảng tổng hợp bị lệch
     emp = db.query(Employee).filter(
         Employee.id == employee_id,
         Employee.deleted == False
-    ).first()
+    ).with_for_update().first()
 
     if not emp:
         raise HTTPException(status_code=404, detail="Không tìm thấy nhân viên")
 
+    before = department_stats.employee_snapshot(emp)
+    old_department_id = emp.department_id
+
     for field, value in data.dict(exclude_unset=True).items():
         setattr(emp, field, value)
 
     emp.updated_at = datetime.utcnow()
+    department_stats.apply_employee_change(db, before, department_stats.employee_snapshot(emp))
+    if emp.department_id != old_department_id:
+        # Bảng lương được tính theo phòng ban hiện tại => chuyển tổng lương cũ
+        # của nhân viên sang phòng ban mới (flush: session tắt autoflush)
+        db.flush()
+        department_stats.rebuild_payroll_stats(
+            db, department_ids={old_department_id, emp.department_id}
+        )
     db.commit()
     db.refresh(emp)
 
@@ -196,14 +812,21 @@ def delete_employee(
     employee_id: int,
     db: Session = Depends(get_db),
 ):
+    # Khóa dòng: snapshot "trước" phải khớp với lần ghi, nếu không 2 request
+    # đồng thời cùng trừ vào trạng thái / phòng ban cũ và bảng tổng hợp bị lệch
     emp = db.query(Employee).filter(
         Employee.id == employee_id,
         Employee.deleted == False
-    ).first()
+    ).with_for_update().first()
 
     if not emp:
         raise HTTPException(status_code=404, detail="Không tìm thấy nhân viên")
 
+    before = department_stats.employee_snapshot(emp)
+
     emp.deleted = True
     emp.deleted_at = datetime.utcnow()
+    # Bump updated_at để ETag của các danh sách thay đổi theo
+    emp.updated_at = emp.deleted_at
+    department_stats.apply_employee_change(db, before, None)
     db.commit()
@@ -1,13 +1,41 @@
+from decimal import Decimal
 from typing import List, Optional
 
-from app.auth.jwt_bearer import JWTBearer
+from app.auth.jwt_bearer import jwt_bearer
 from app.database import get_db
+from app.models.employees import Employee
 from app.models.payrolls import Payroll
-from app.schemas.payrolls import PayrollCreate, PayrollResponse, PayrollUpdate
+from app.schemas.employees import EmployeeMini
+from app.schemas.payrolls import (
+    PayrollCreate,
+    PayrollPage,
+    PayrollResponse,
+    PayrollRunResult,
+    PayrollUpdate,
+    PayrollUpsertResult,
+    PayslipJobResponse,
+)
+from app.services import department_stats, payroll_run, payslips
+from app.utils.fields import Projection
 from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import FileResponse, JSONResponse
+from sqlalchemy import func
+from sqlalchemy.dialects.mysql import insert as mysql_insert
 from sqlalchemy.orm import Session, joinedload
 
-router = APIRouter(prefix="/payrolls", tags=["Payrolls"], dependencies=[Depends(JWTBearer())])
+router = APIRouter(prefix="/payrolls", tags=["Payrolls"], dependencies=[Depends(jwt_bearer)])
+
+
+# ?fields=... : chỉ lấy các cột / quan hệ được yêu cầu
+PAYROLL_PROJECTION = Projection(
+    Payroll,
+    PayrollResponse,
+    relations={"employee": (Payroll.employee, EmployeeMini)},
+)
+
+
+# Danh sách không phân trang bị giới hạn số dòng; màn hình danh sách dùng /paged
+PAYROLL_LIST_MAX_LIMIT = 1000
 
 
 @router.get("/", response_model=List[PayrollResponse])
@@ -16,8 +44,15 @@ def list_payrolls(
     employee_id: Optional[int] = None,
     month: Optional[int] = None,
     year: Optional[int] = None,
+    fields: Optional[str] = None,
+    skip: int = 0,
+    limit: int = PAYROLL_LIST_MAX_LIMIT,
 ):
+    selected = PAYROLL_PROJECTION.parse(fields)
+
     query = db.query(Payroll)
+    if selected:
+        query = query.options(*PAYROLL_PROJECTION.options(selected))
 
     if employee_id:
         query = query.filter(Payroll.employee_id == employee_id)
@@ -28,7 +63,249 @@ def list_payrolls(
     if year:
         query = query.filter(Payroll.year == year)
 
-    return query.order_by(Payroll.year.desc(), Payroll.month.desc()).all()
+    limit = min(max(limit, 1), PAYROLL_LIST_MAX_LIMIT)
+    payrolls = (
+        query.order_by(Payroll.year.desc(), Payroll.month.desc(), Payroll.id.desc())
+        .offset(max(skip, 0))
+        .limit(limit)
+        .all()
+    )
+
+    if selected:
+        return JSONResponse([PAYROLL_PROJECTION.serialize(p, selected) for p in payrolls])
+
+    return payrolls
+
+
+# ======================================================
+# ENDPOINT CÓ PHÂN TRANG + BỘ LỌC + DÒNG TỔNG HỢP (DÙNG CHO LIST PAGE)
+# - Tổng số dòng và sum/avg/min/max của total_salary tính bằng window
+#   function trên cùng câu truy vấn lấy trang => 1 round trip
+# ======================================================
+
+def _payroll_summary(query) -> dict:
+    count, sum_total, avg_total, min_total, max_total = query.with_entities(
+        func.count(Payroll.id),
+        func.coalesce(func.sum(Payroll.total_salary), 0),
+        func.avg(Payroll.total_salary),
+        func.min(Payroll.total_salary),
+        func.max(Payroll.total_salary),
+    ).one()
+
+    return {
+        "count": count,
+        "sum_total": sum_total,
+        "avg_total": avg_total,
+        "min_total": min_total,
+        "max_total": max_total,
+    }
+
+
+@router.get("/paged", response_model=PayrollPage)
+def list_payrolls_paged(
+    db: Session = Depends(get_db),
+    employee_id: Optional[int] = None,
+    department_id: Optional[int] = None,
+    month: Optional[int] = None,
+    year_from: Optional[int] = None,
+    year_to: Optional[int] = None,
+    salary_min: Optional[Decimal] = None,
+    salary_max: Optional[Decimal] = None,
+    page: int = 1,
+    page_size: int = 20,
+):
+    query = db.query(Payroll)
+
+    if department_id:
+        query = query.join(Employee, Payroll.employee_id == Employee.id).filter(
+            Employee.department_id == department_id
+        )
+
+    if employee_id:
+        query = query.filter(Payroll.employee_id == employee_id)
+
+    if month:
+        query = query.filter(Payroll.month == month)
+
+    if year_from:
+        query = query.filter(Payroll.year >= year_from)
+
+    if year_to:
+        query = query.filter(Payroll.year <= year_to)
+
+    if salary_min is not None:
+        query = query.filter(Payroll.total_salary >= salary_min)
+
+    if salary_max is not None:
+        query = query.filter(Payroll.total_salary <= salary_max)
+
+    if page < 1:
+        page = 1
+    if page_size <= 0:
+        page_size = 20
+
+    rows = (
+        query.add_columns(
+            func.count().over().label("total_count"),
+            func.coalesce(func.sum(Payroll.total_salary).over(), 0).label("sum_total"),
+            func.avg(Payroll.total_salary).over().label("avg_total"),
+            func.min(Payroll.total_salary).over().label("min_total"),
+            func.max(Payroll.total_salary).over().label("max_total"),
+        )
+        .options(joinedload(Payroll.employee))
+        .order_by(Payroll.year.desc(), Payroll.month.desc(), Payroll.id.desc())
+        .offset((page - 1) * page_size)
+        .limit(page_size)
+        .all()
+    )
+
+    if rows:
+        first = rows[0]
+        summary = {
+            "count": first.total_count,
+            "sum_total": first.sum_total,
+            "avg_total": first.avg_total,
+            "min_total": first.min_total,
+            "max_total": first.max_total,
+        }
+    else:
+        # Trang vượt quá kết quả: không có dòng nào mang giá trị window
+        summary = _payroll_summary(query)
+
+    return {
+        "items": [row.Payroll for row in rows],
+        "total": summary["count"],
+        "page": page,
+        "page_size": page_size,
+        "summary": summary,
+    }
+
+
+# ======================================================
+# CHẠY BẢNG LƯƠNG THÁNG (set-based, xem app/services/payroll_run.py)
+# ======================================================
+
+@router.post("/run", response_model=PayrollRunResult)
+def run_monthly_payroll(
+    month: int,
+    year: int,
+    allowance: Decimal = Decimal(0),
+    prorate: bool = True,
+    overwrite: bool = False,
+    db: Session = Depends(get_db),
+):
+    if not 1 <= month <= 12:
+        raise HTTPException(400, "Tháng không hợp lệ")
+
+    existing = db.query(Payroll.id).filter(Payroll.year == year, Payroll.month == month)
+
+    if existing.first():
+        if not overwrite:
+            raise HTTPException(409, "Bảng lương tháng này đã tồn tại (dùng overwrite=true để tính lại)")
+        existing.delete(synchronize_session=False)
+
+    employees = payroll_run.run_payroll(db, year, month, allowance, prorate)
+    department_stats.rebuild_payroll_stats(db, year, month)
+
+    total_amount = (
+        db.query(func.coalesce(func.sum(Payroll.total_salary), 0))
+        .filter(Payroll.year == year, Payroll.month == month)
+        .scalar()
+    )
+
+    db.commit()
+
+    return {
+        "month": month,
+        "year": year,
+        "standard_hours": payroll_run.standard_hours(year, month),
+        "employees": employees,
+        "total_amount": total_amount,
+    }
+
+
+# ======================================================
+# BULK UPSERT – INSERT ... ON DUPLICATE KEY UPDATE theo khóa
+# (employee_id, year, month): chạy lại 1 tháng là ghi đè, không nhân đôi
+# ======================================================
+
+UPSERT_CHUNK_SIZE = 1000
+
+
+@router.post("/bulk", response_model=PayrollUpsertResult)
+def bulk_upsert_payrolls(data: List[PayrollCreate], db: Session = Depends(get_db)):
+    rows = [item.dict() for item in data]
+    if not rows:
+        return {"received": 0, "affected_rows": 0}
+
+    employee_ids = {row["employee_id"] for row in rows}
+    known_ids = {
+        employee_id
+        for (employee_id,) in db.query(Employee.id).filter(Employee.id.in_(employee_ids))
+    }
+    unknown_ids = sorted(employee_ids - known_ids)
+    if unknown_ids:
+        raise HTTPException(400, f"Không tìm thấy nhân viên: {', '.join(map(str, unknown_ids))}")
+
+    affected_rows = 0
+    for start in range(0, len(rows), UPSERT_CHUNK_SIZE):
+        stmt = mysql_insert(Payroll).values(rows[start:start + UPSERT_CHUNK_SIZE])
+        stmt = stmt.on_duplicate_key_update(
+            base_salary=stmt.inserted.base_salary,
+            allowance=stmt.inserted.allowance,
+            bonus=stmt.inserted.bonus,
+            penalty=stmt.inserted.penalty,
+            total_salary=stmt.inserted.total_salary,
+        )
+        affected_rows += db.execute(stmt).rowcount
+
+    for year, month in {(row["year"], row["month"]) for row in rows}:
+        department_stats.rebuild_payroll_stats(db, year, month)
+
+    db.commit()
+
+    return {"received": len(rows), "affected_rows": affected_rows}
+
+
+# ======================================================
+# PHIẾU LƯƠNG – render nền bằng process pool (app/services/payslips.py)
+# ======================================================
+
+@router.post("/payslips", response_model=PayslipJobResponse, status_code=202)
+def create_payslip_job(month: int, year: int, db: Session = Depends(get_db)):
+    if not 1 <= month <= 12:
+        raise HTTPException(400, "Tháng không hợp lệ")
+
+    exists = db.query(Payroll.id).filter(Payroll.year == year, Payroll.month == month).first()
+    if not exists:
+        raise HTTPException(404, "Chưa có bảng lương cho tháng này")
+
+    return payslips.start_job(year, month)
+
+
+def _get_payslip_job(job_id: str) -> dict:
+    job = payslips.get_job(job_id)
+    if not job:
+        raise HTTPException(404, "Không tìm thấy job phiếu lương")
+    return job
+
+
+@router.get("/payslips/{job_id}", response_model=PayslipJobResponse)
+def get_payslip_job(job_id: str):
+    return _get_payslip_job(job_id)
+
+
+@router.get("/payslips/{job_id}/download")
+def download_payslips(job_id: str):
+    job = _get_payslip_job(job_id)
+    if job["status"] != "completed":
+        raise HTTPException(409, "Job phiếu lương chưa hoàn tất")
+
+    return FileResponse(
+        payslips.zip_path(job["job_id"]),
+        media_type="application/zip",
+        filename=f"payslips_{job['year']}_{job['month']:02d}.zip",
+    )
 
 
 @router.get("/{payroll_id}", response_model=PayrollResponse)
@@ -48,9 +325,24 @@ def get_payroll(payroll_id: int, db: Session = Depends(get_db)):
 
 @router.post("/", response_model=PayrollResponse, status_code=201)
 def create_payroll(data: PayrollCreate, db: Session = Depends(get_db)):
+    existed = (
+        db.query(Payroll.id)
+        .filter(
+            Payroll.employee_id == data.employee_id,
+            Payroll.year == data.year,
+            Payroll.month == data.month,
+        )
+        .first()
+    )
+    if existed:
+        raise HTTPException(400, "Nhân viên đã có bảng lương tháng này")
+
     payroll = Payroll(**data.dict())
 
     db.add(payroll)
+    department_stats.apply_payroll_change(
+        db, payroll.employee_id, payroll.year, payroll.month, payroll.total_salary, 1
+    )
     db.commit()
     db.refresh(payroll)
 
@@ -64,9 +356,14 @@ def update_payroll(payroll_id: int, data: PayrollUpdate, db: Session = Depends(g
     if not item:
         raise HTTPException(404, "Không tìm thấy bảng lương")
 
+    old_total = item.total_salary or 0
+
     for field, value in data.dict(exclude_unset=True).items():
         setattr(item, field, value)
 
+    department_stats.apply_payroll_change(
+        db, item.employee_id, item.year, item.month, (item.total_salary or 0) - old_total, 0
+    )
     db.commit()
     db.refresh(item)
 
@@ -80,6 +377,9 @@ def delete_payroll(payroll_id: int, db: Session = Depends(get_db)):
     if not item:
         raise HTTPException(404, "Không tìm thấy bảng lương")
 
+    department_stats.apply_payroll_change(
+        db, item.employee_id, item.year, item.month, -(item.total_salary or 0), -1
+    )
     db.delete(item)
     db.commit()
 
@@ -10,13 +10,14 @@ from app.schemas.positions import (
     PositionUpdate,
     PositionResponse,
 )
+from app.services.reference_cache import paginate, positions_cache, search_items
 
-from app.auth.jwt_bearer import JWTBearer
+from app.auth.jwt_bearer import jwt_bearer
 
 router = APIRouter(
     prefix="/positions",
     tags=["Positions"],
-    dependencies=[Depends(JWTBearer())]
+    dependencies=[Depends(jwt_bearer)]
 )
 
 
@@ -27,30 +28,19 @@ def list_positions(
     page: int = 1,
     page_size: int = 50,
 ):
-    query = db.query(Position).filter(Position.deleted == False)
-
-    if search:
-        like_value = f"%{search}%"
-        query = query.filter(Position.name.ilike(like_value))
-
     if page < 1:
         page = 1
     if page_size < 1:
         page_size = 50
 
-    skip = (page - 1) * page_size
-    items = query.order_by(Position.id.desc()).offset(skip).limit(page_size).all()
+    items = search_items(positions_cache.all(db), "name", search)
 
-    return items
+    return paginate(items, page, page_size)
 
 
 @router.get("/{position_id}", response_model=PositionResponse)
 def get_position(position_id: int, db: Session = Depends(get_db)):
-    pos = (
-        db.query(Position)
-        .filter(Position.id == position_id, Position.deleted == False)
-        .first()
-    )
+    pos = positions_cache.get(db, position_id)
 
     if not pos:
         raise HTTPException(status_code=404, detail="Không tìm thấy chức vụ")
@@ -79,6 +69,7 @@ def create_position(data: PositionCreate, db: Session = Depends(get_db)):
     db.add(pos)
     db.commit()
     db.refresh(pos)
+    positions_cache.invalidate()
     return pos
 
 
@@ -120,6 +111,7 @@ def update_position(
 
     db.commit()
     db.refresh(pos)
+    positions_cache.invalidate()
 
     return pos
 
@@ -136,7 +128,9 @@ def delete_position(position_id: int, db: Session = Depends(get_db)):
 
     pos.deleted = True
     pos.deleted_at = datetime.utcnow()
+    pos.updated_at = pos.deleted_at
 
     db.commit()
+    positions_cache.invalidate()
 
     return
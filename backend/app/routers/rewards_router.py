@@ -1,14 +1,19 @@
-from fastapi import APIRouter, Depends, HTTPException
+from datetime import date
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import case, func
 from sqlalchemy.orm import Session
 from typing import List, Optional
 
 from app.database import get_db
+from app.models.employees import Employee
 from app.models.reward_discipline import RewardDiscipline
-from app.schemas.rewards import RewardCreate, RewardUpdate, RewardResponse
+from app.schemas.common import PaginatedResponse
+from app.schemas.rewards import RewardCreate, RewardResponse, RewardSummary, RewardUpdate
+from app.services.payroll_run import month_range
 
-from app.auth.jwt_bearer import JWTBearer
+from app.auth.jwt_bearer import jwt_bearer
 
-router = APIRouter(prefix="/rewards", tags=["Rewards & Discipline"], dependencies=[Depends(JWTBearer())])
+router = APIRouter(prefix="/rewards", tags=["Rewards & Discipline"], dependencies=[Depends(jwt_bearer)])
 
 
 @router.get("/", response_model=List[RewardResponse])
@@ -28,6 +33,116 @@ def list_rewards(
     return query.order_by(RewardDiscipline.date.desc()).all()
 
 
+def _period_range(year: Optional[int], month: Optional[int]):
+    # Lọc theo khoảng ngày (không dùng YEAR(date)/MONTH(date)) để dùng được index
+    if month is not None and year is None:
+        raise HTTPException(400, "Lọc theo tháng cần kèm năm")
+    if month is not None and not 1 <= month <= 12:
+        raise HTTPException(400, "Tháng không hợp lệ")
+    if year is None:
+        return None
+    if month is not None:
+        return month_range(year, month)
+    return date(year, 1, 1), date(year, 12, 31)
+
+
+def _normalize_paging(page: int, page_size: int):
+    if page < 1:
+        page = 1
+    if page_size <= 0:
+        page_size = 20
+    return page, page_size
+
+
+@router.get("/paged", response_model=PaginatedResponse[RewardResponse])
+def list_rewards_paged(
+    db: Session = Depends(get_db),
+    employee_id: Optional[int] = None,
+    type: Optional[str] = None,
+    year: Optional[int] = None,
+    month: Optional[int] = None,
+    page: int = 1,
+    page_size: int = 20,
+):
+    page, page_size = _normalize_paging(page, page_size)
+    query = db.query(RewardDiscipline)
+
+    if employee_id:
+        query = query.filter(RewardDiscipline.employee_id == employee_id)
+
+    if type:
+        query = query.filter(RewardDiscipline.type == type)
+
+    period = _period_range(year, month)
+    if period:
+        query = query.filter(RewardDiscipline.date.between(*period))
+
+    total = query.count()
+    items = (
+        query.order_by(RewardDiscipline.date.desc(), RewardDiscipline.id.desc())
+        .offset((page - 1) * page_size)
+        .limit(page_size)
+        .all()
+    )
+
+    return {"items": items, "total": total, "page": page, "page_size": page_size}
+
+
+# ======================================================
+# TỔNG THƯỞNG / PHẠT THEO NHÂN VIÊN TRONG KỲ (GROUP BY, index employee_id + date)
+# ======================================================
+
+@router.get("/summary", response_model=PaginatedResponse[RewardSummary])
+def reward_summary(
+    db: Session = Depends(get_db),
+    year: int = Query(...),
+    month: Optional[int] = None,
+    department_id: Optional[int] = None,
+    page: int = 1,
+    page_size: int = 50,
+):
+    page, page_size = _normalize_paging(page, page_size)
+    is_reward = RewardDiscipline.type == "reward"
+    is_discipline = RewardDiscipline.type == "discipline"
+    reward_total = func.coalesce(func.sum(case((is_reward, RewardDiscipline.amount), else_=0)), 0)
+    discipline_total = func.coalesce(func.sum(case((is_discipline, RewardDiscipline.amount), else_=0)), 0)
+
+    query = (
+        db.query(
+            RewardDiscipline.employee_id,
+            Employee.code,
+            Employee.full_name,
+            func.sum(case((is_reward, 1), else_=0)).label("reward_count"),
+            reward_total.label("reward_total"),
+            func.sum(case((is_discipline, 1), else_=0)).label("discipline_count"),
+            discipline_total.label("discipline_total"),
+            (reward_total - discipline_total).label("net_amount"),
+        )
+        .join(Employee, RewardDiscipline.employee_id == Employee.id)
+        .filter(RewardDiscipline.date.between(*_period_range(year, month)))
+    )
+
+    if department_id:
+        query = query.filter(Employee.department_id == department_id)
+
+    query = query.group_by(RewardDiscipline.employee_id, Employee.code, Employee.full_name)
+
+    total = query.order_by(None).count()
+    rows = (
+        query.order_by(RewardDiscipline.employee_id)
+        .offset((page - 1) * page_size)
+        .limit(page_size)
+        .all()
+    )
+
+    return {
+        "items": [dict(row._mapping) for row in rows],
+        "total": total,
+        "page": page,
+        "page_size": page_size,
+    }
+
+
 @router.get("/{item_id}", response_model=RewardResponse)
 def get_reward(item_id: int, db: Session = Depends(get_db)):
     item = db.query(RewardDiscipline).filter(RewardDiscipline.id == item_id).first()
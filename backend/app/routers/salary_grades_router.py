@@ -5,19 +5,22 @@ from datetime import datetime
 from decimal import Decimal
 
 from app.database import get_db
+from app.models.employees import Employee
 from app.models.salary_grades import SalaryGrade
 from app.schemas.salary_grades import (
     SalaryGradeCreate,
     SalaryGradeUpdate,
     SalaryGradeResponse,
 )
+from app.services import department_stats
+from app.services.reference_cache import salary_grades_cache, search_items
 
-from app.auth.jwt_bearer import JWTBearer
+from app.auth.jwt_bearer import jwt_bearer
 
 router = APIRouter(
     prefix="/salary-grades",
     tags=["Salary Grades"],
-    dependencies=[Depends(JWTBearer())]
+    dependencies=[Depends(jwt_bearer)]
 )
 
 
@@ -26,22 +29,12 @@ def list_grades(
     db: Session = Depends(get_db),
     search: Optional[str] = None,
 ):
-    query = db.query(SalaryGrade).filter(SalaryGrade.deleted == False)
-
-    if search:
-        like_value = f"%{search}%"
-        query = query.filter(SalaryGrade.grade_name.ilike(like_value))
-
-    return query.order_by(SalaryGrade.id.desc()).all()
+    return search_items(salary_grades_cache.all(db), "grade_name", search)
 
 
 @router.get("/{grade_id}", response_model=SalaryGradeResponse)
 def get_grade(grade_id: int, db: Session = Depends(get_db)):
-    grade = (
-        db.query(SalaryGrade)
-        .filter(SalaryGrade.id == grade_id, SalaryGrade.deleted == False)
-        .first()
-    )
+    grade = salary_grades_cache.get(db, grade_id)
 
     if not grade:
         raise HTTPException(status_code=404, detail="Không tìm thấy bậc lương")
@@ -72,6 +65,7 @@ def create_grade(data: SalaryGradeCreate, db: Session = Depends(get_db)):
     db.add(grade)
     db.commit()
     db.refresh(grade)
+    salary_grades_cache.invalidate()
 
     return grade
 
@@ -113,8 +107,22 @@ def update_grade(
         setattr(grade, field, value)
 
     grade.updated_at = datetime.utcnow()
+
+    if "base_salary" in update_data:
+        # Lương cơ bản trung bình của các phòng ban có nhân viên thuộc bậc này
+        # (flush trước để INSERT ... SELECT đọc được base_salary mới)
+        db.flush()
+        department_ids = {
+            department_id
+            for (department_id,) in db.query(Employee.department_id)
+            .filter(Employee.salary_grade_id == grade_id, Employee.deleted == False)
+            .distinct()
+        }
+        department_stats.rebuild_department_stats(db, department_ids)
+
     db.commit()
     db.refresh(grade)
+    salary_grades_cache.invalidate()
 
     return grade
 
@@ -132,6 +140,8 @@ def delete_grade(grade_id: int, db: Session = Depends(get_db)):
 
     grade.deleted = True
     grade.deleted_at = datetime.utcnow()
+    grade.updated_at = grade.deleted_at
 
     db.commit()
+    salary_grades_cache.invalidate()
     return
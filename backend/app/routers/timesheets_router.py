@@ -1,14 +1,70 @@
-from fastapi import APIRouter, Depends, HTTPException
+import asyncio
+from datetime import date as date_type, time
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import case, distinct, func, select, union_all
 from sqlalchemy.orm import Session
-from typing import List, Optional
+from typing import Dict, List, Optional
 
 from app.database import get_db
+from app.models.employees import Employee
+from app.models.timesheet_archive import TimesheetArchive
 from app.models.timesheets import Timesheet
-from app.schemas.timesheets import TimesheetCreate, TimesheetUpdate, TimesheetResponse
+from app.schemas.common import BulkActionResult, PaginatedResponse
+from app.schemas.timesheets import (
+    TimesheetBatchResult,
+    TimesheetCreate,
+    TimesheetResponse,
+    TimesheetSummary,
+    TimesheetUpdate,
+)
+from app.services import timesheet_ingest
+from app.services.timesheet_archive import ARCHIVE_COLUMNS
+from app.utils.working_hours import (
+    compute_working_hours,
+    fill_working_hours,
+    working_hours_expression,
+)
+
+from app.auth.jwt_bearer import jwt_bearer
+
+router = APIRouter(prefix="/timesheets", tags=["Timesheets"], dependencies=[Depends(jwt_bearer)])
+
 
-from app.auth.jwt_bearer import JWTBearer
+def _apply_timesheet_filters(
+    query,
+    employee_id: Optional[int],
+    date_from: Optional[date_type],
+    date_to: Optional[date_type],
+    model=Timesheet,
+):
+    # Lọc theo khoảng ngày dùng index (employee_id, date) và partition pruning
+    if date_from and date_to and date_from > date_to:
+        raise HTTPException(400, "Khoảng ngày không hợp lệ")
+
+    if employee_id:
+        query = query.filter(model.employee_id == employee_id)
 
-router = APIRouter(prefix="/timesheets", tags=["Timesheets"], dependencies=[Depends(JWTBearer())])
+    if date_from:
+        query = query.filter(model.date >= date_from)
+
+    if date_to:
+        query = query.filter(model.date <= date_to)
+
+    return query
+
+
+def _timesheet_select(model, employee_id, date_from, date_to, exact_date):
+    query = _apply_timesheet_filters(
+        select(*(getattr(model, column) for column in ARCHIVE_COLUMNS)),
+        employee_id,
+        date_from,
+        date_to,
+        model,
+    )
+    if exact_date:
+        query = query.filter(model.date == exact_date)
+    return query
 
 
 @router.get("/", response_model=List[TimesheetResponse])
@@ -16,11 +72,19 @@ def list_timesheets(
     db: Session = Depends(get_db),
     employee_id: Optional[int] = None,
     date: Optional[str] = None,  # YYYY-MM-DD
+    date_from: Optional[date_type] = Query(None, alias="from"),
+    date_to: Optional[date_type] = Query(None, alias="to"),
+    include_archive: bool = False,  # đọc thêm các năm đã lưu trữ (timesheets_archive)
 ):
-    query = db.query(Timesheet)
+    if include_archive:
+        combined = union_all(
+            _timesheet_select(Timesheet, employee_id, date_from, date_to, date),
+            _timesheet_select(TimesheetArchive, employee_id, date_from, date_to, date),
+        ).subquery()
+        rows = db.execute(select(combined).order_by(combined.c.date.desc()))
+        return [dict(row._mapping) for row in rows]
 
-    if employee_id:
-        query = query.filter(Timesheet.employee_id == employee_id)
+    query = _apply_timesheet_filters(db.query(Timesheet), employee_id, date_from, date_to)
 
     if date:
         query = query.filter(Timesheet.date == date)
@@ -28,6 +92,169 @@ def list_timesheets(
     return query.order_by(Timesheet.date.desc()).all()
 
 
+@router.get("/paged", response_model=PaginatedResponse[TimesheetResponse])
+def list_timesheets_paged(
+    db: Session = Depends(get_db),
+    employee_id: Optional[int] = None,
+    date_from: Optional[date_type] = Query(None, alias="from"),
+    date_to: Optional[date_type] = Query(None, alias="to"),
+    page: int = 1,
+    page_size: int = 31,
+):
+    if page < 1:
+        page = 1
+    if page_size <= 0:
+        page_size = 31
+
+    query = _apply_timesheet_filters(db.query(Timesheet), employee_id, date_from, date_to)
+
+    total = query.order_by(None).count()
+    items = (
+        query.order_by(Timesheet.date.desc(), Timesheet.id.desc())
+        .offset((page - 1) * page_size)
+        .limit(page_size)
+        .all()
+    )
+
+    return {"items": items, "total": total, "page": page, "page_size": page_size}
+
+
+# ======================================================
+# TỔNG HỢP CHẤM CÔNG THEO NHÂN VIÊN TRONG 1 KỲ (1 câu GROUP BY)
+# ======================================================
+
+@router.get("/summary", response_model=List[TimesheetSummary])
+def timesheet_summary(
+    db: Session = Depends(get_db),
+    date_from: date_type = Query(..., alias="from"),
+    date_to: date_type = Query(..., alias="to"),
+    employee_id: Optional[int] = None,
+    department_id: Optional[int] = None,
+    late_after: time = time(8, 0),  # check_in sau giờ này tính là đi muộn
+):
+    query = _apply_timesheet_filters(
+        db.query(
+            Timesheet.employee_id,
+            Employee.code,
+            Employee.full_name,
+            func.count(distinct(case((Timesheet.check_in.isnot(None), Timesheet.date)))).label("days_present"),
+            func.coalesce(func.sum(Timesheet.working_hours), 0).label("total_hours"),
+            func.coalesce(func.sum(case((Timesheet.check_in > late_after, 1), else_=0)), 0).label("late_arrivals"),
+        ).join(Employee, Timesheet.employee_id == Employee.id),
+        employee_id,
+        date_from,
+        date_to,
+    )
+
+    if department_id:
+        query = query.filter(Employee.department_id == department_id)
+
+    rows = (
+        query.group_by(Timesheet.employee_id, Employee.code, Employee.full_name)
+        .order_by(Timesheet.employee_id)
+        .all()
+    )
+
+    return [
+        {
+            "employee_id": row.employee_id,
+            "code": row.code,
+            "full_name": row.full_name,
+            "days_present": row.days_present,
+            "total_hours": row.total_hours,
+            "late_arrivals": row.late_arrivals,
+        }
+        for row in rows
+    ]
+
+
+# ======================================================
+# GHI HÀNG LOẠT (máy chấm công gửi dồn sự kiện)
+# ======================================================
+
+def _batch_result(count: int, errors: Dict[int, str]) -> dict:
+    return {
+        "received": count,
+        "accepted": count - len(errors),
+        "rejected": len(errors),
+        "results": [
+            {"index": index, "accepted": index not in errors, "error": errors.get(index)}
+            for index in range(count)
+        ],
+    }
+
+
+# 1 request = 1 transaction, INSERT theo chunk
+@router.post("/batch", response_model=TimesheetBatchResult)
+def ingest_timesheets(data: List[TimesheetCreate], db: Session = Depends(get_db)):
+    rows = [item.dict() for item in data]
+    errors = timesheet_ingest.bulk_ingest(db, rows) if rows else {}
+    db.commit()
+
+    return _batch_result(len(rows), errors)
+
+
+# Gom sự kiện của nhiều request vào bộ đệm write-behind; trả về khi lô chứa
+# các sự kiện này đã commit (không giữ connection DB trong lúc chờ)
+@router.post("/buffered", response_model=TimesheetBatchResult)
+async def ingest_timesheets_buffered(data: List[TimesheetCreate]):
+    try:
+        futures = timesheet_ingest.timesheet_buffer.submit([item.dict() for item in data])
+    except RuntimeError as exc:
+        raise HTTPException(503, str(exc))
+
+    # shield: hết thời gian chờ chỉ bỏ chờ, sự kiện vẫn nằm trong lô sẽ ghi
+    outcomes = await asyncio.gather(
+        *(
+            asyncio.wait_for(
+                asyncio.shield(asyncio.wrap_future(future)),
+                timesheet_ingest.TIMESHEET_BUFFER_ACK_TIMEOUT,
+            )
+            for future in futures
+        ),
+        return_exceptions=True,
+    )
+    errors = {
+        index: (
+            "Hết thời gian chờ xác nhận ghi (sự kiện có thể vẫn được ghi sau)"
+            if isinstance(outcome, asyncio.TimeoutError)
+            else str(outcome)
+        )
+        for index, outcome in enumerate(outcomes)
+        if isinstance(outcome, Exception)
+    }
+
+    return _batch_result(len(outcomes), errors)
+
+
+# ======================================================
+# TÍNH LẠI working_hours CHO 1 KHOẢNG NGÀY (1 câu UPDATE, xử lý ca đêm)
+# ======================================================
+
+@router.post("/recompute", response_model=BulkActionResult)
+def recompute_working_hours(
+    db: Session = Depends(get_db),
+    date_from: date_type = Query(..., alias="from"),
+    date_to: date_type = Query(..., alias="to"),
+    employee_id: Optional[int] = None,
+    overwrite: bool = False,  # False: chỉ điền các dòng chưa có working_hours
+):
+    query = _apply_timesheet_filters(
+        db.query(Timesheet), employee_id, date_from, date_to
+    ).filter(Timesheet.check_in.isnot(None), Timesheet.check_out.isnot(None))
+
+    if not overwrite:
+        query = query.filter(Timesheet.working_hours.is_(None))
+
+    affected = query.update(
+        {Timesheet.working_hours: working_hours_expression(Timesheet.check_in, Timesheet.check_out)},
+        synchronize_session=False,
+    )
+    db.commit()
+
+    return {"affected": affected}
+
+
 @router.get("/{timesheet_id}", response_model=TimesheetResponse)
 def get_timesheet(timesheet_id: int, db: Session = Depends(get_db)):
     item = db.query(Timesheet).filter(Timesheet.id == timesheet_id).first()
@@ -40,7 +267,7 @@ def get_timesheet(timesheet_id: int, db: Session = Depends(get_db)):
 
 @router.post("/", response_model=TimesheetResponse, status_code=201)
 def create_timesheet(data: TimesheetCreate, db: Session = Depends(get_db)):
-    item = Timesheet(**data.dict())
+    item = Timesheet(**fill_working_hours(data.dict()))
 
     db.add(item)
     db.commit()
@@ -56,9 +283,14 @@ def update_timesheet(timesheet_id: int, data: TimesheetUpdate, db: Session = Dep
     if not item:
         raise HTTPException(404, "Không tìm thấy dữ liệu chấm công")
 
-    for field, value in data.dict(exclude_unset=True).items():
+    changes = data.dict(exclude_unset=True)
+    for field, value in changes.items():
         setattr(item, field, value)
 
+    # Đổi giờ vào / ra mà không gửi working_hours => tính lại
+    if "working_hours" not in changes and ({"check_in", "check_out"} & changes.keys()):
+        item.working_hours = compute_working_hours(item.check_in, item.check_out)
+
     db.commit()
     db.refresh(item)
 
@@ -1,4 +1,5 @@
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 from typing import List, Optional
 
@@ -6,13 +7,13 @@ from app.database import get_db
 from app.models.users import User
 from app.schemas.users import UserCreate, UserUpdate, UserResponse
 from app.schemas.auth import LoginUserInfo
-from app.auth.jwt_bearer import JWTBearer
-from app.utils.password import hash_password, verify_password
+from app.auth.jwt_bearer import jwt_bearer
+from app.services.password_hasher import password_hasher
 
 router = APIRouter(
     prefix="/users",
     tags=["Users"],
-    dependencies=[Depends(JWTBearer())]  # bắt buộc có token
+    dependencies=[Depends(jwt_bearer)]  # bắt buộc có token
 )
 
 # -------------------------
@@ -46,16 +47,11 @@ def get_user(user_id: int, db: Session = Depends(get_db)):
 # -------------------------
 # CREATE USER
 # -------------------------
-@router.post("/", response_model=UserResponse, status_code=201)
-def create_user(data: UserCreate, db: Session = Depends(get_db)):
-
-    # Check email trùng
-    existed = db.query(User).filter(User.email == data.email).first()
-    if existed:
-        raise HTTPException(400, "Email đã tồn tại")
+def _email_exists(db: Session, email: str) -> bool:
+    return db.query(User.id).filter(User.email == email).first() is not None
 
-    hashed = hash_password(data.password)
 
+def _insert_user(db: Session, data: UserCreate, hashed: str) -> User:
     new_user = User(
         full_name=data.full_name,
         email=data.email,
@@ -72,6 +68,20 @@ def create_user(data: UserCreate, db: Session = Depends(get_db)):
     return new_user
 
 
+# bcrypt chạy trên executor riêng (app/services/password_hasher.py),
+# truy vấn DB chạy trong threadpool
+@router.post("/", response_model=UserResponse, status_code=201)
+async def create_user(data: UserCreate, db: Session = Depends(get_db)):
+
+    # Check email trùng
+    if await run_in_threadpool(_email_exists, db, data.email):
+        raise HTTPException(400, "Email đã tồn tại")
+
+    hashed = await password_hasher.hash(data.password)
+
+    return await run_in_threadpool(_insert_user, db, data, hashed)
+
+
 # -------------------------
 # UPDATE USER INFO
 # -------------------------
@@ -100,19 +110,30 @@ def update_user(user_id: int, data: UserUpdate, db: Session = Depends(get_db)):
 # -------------------------
 # UPDATE PASSWORD
 # -------------------------
+def _get_active_user(db: Session, user_id: int) -> User:
+    user = db.query(User).filter(User.id == user_id, User.deleted == False).first()
+    if not user:
+        raise HTTPException(404, "Không tìm thấy người dùng")
+    return user
+
+
+def _set_password_hash(db: Session, user_id: int, hashed: str):
+    user = _get_active_user(db, user_id)
+    user.password_hash = hashed
+    db.commit()
+
+
 @router.put("/{user_id}/password")
-def update_password(
+async def update_password(
     user_id: int,
     new_pass: str,
     db: Session = Depends(get_db),
 ):
-    user = db.query(User).filter(User.id == user_id, User.deleted == False).first()
-    if not user:
-        raise HTTPException(404, "Không tìm thấy người dùng")
+    await run_in_threadpool(_get_active_user, db, user_id)
 
-    user.password_hash = hash_password(new_pass)
+    hashed = await password_hasher.hash(new_pass)
+    await run_in_threadpool(_set_password_hash, db, user_id, hashed)
 
-    db.commit()
     return {"message": "Đổi mật khẩu thành công"}
 
 
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, EmailStr
-from typing import Any, Dict
+from typing import Any, Dict, Optional
 
 
 class LoginRequest(BaseModel):
@@ -21,3 +21,14 @@ class LoginResponse(BaseModel):
     access_token: str
     token_type: str = "bearer"
     user: LoginUserInfo
+
+
+class PasswordHashMetrics(BaseModel):
+    workers: int
+    running: int
+    queue_depth: int
+    max_queue: int
+    rejected: int
+    samples: int
+    p50_ms: Optional[float] = None
+    p99_ms: Optional[float] = None
@@ -1,4 +1,4 @@
-from typing import Generic, List, TypeVar
+from typing import Generic, List, Optional, TypeVar
 from pydantic import BaseModel
 
 T = TypeVar("T")
@@ -6,6 +6,12 @@ T = TypeVar("T")
 
 class PaginatedResponse(BaseModel, Generic[T]):
     items: List[T]
-    total: int
-    page: int
+    # Chế độ cursor không đếm tổng (tránh COUNT toàn bảng) nên total/page có thể None
+    total: Optional[int] = None
+    page: Optional[int] = None
     page_size: int
+    next_cursor: Optional[str] = None
+
+
+class BulkActionResult(BaseModel):
+    affected: int
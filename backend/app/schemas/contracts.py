@@ -38,6 +38,25 @@ class ContractUpdate(BaseModel):
 class ContractResponse(ContractBase):
     id: int
     employee: Optional[EmployeeSmall]
+    file_name: Optional[str] = None
+    file_size: Optional[int] = None
+    content_type: Optional[str] = None
+
+    class Config:
+        orm_mode = True
+
+
+class ExpiringContractResponse(ContractResponse):
+    days_left: int
+
+
+class ContractFileResponse(BaseModel):
+    id: int
+    file_url: Optional[str] = None
+    file_name: Optional[str] = None
+    file_size: Optional[int] = None
+    file_sha256: Optional[str] = None
+    content_type: Optional[str] = None
 
     class Config:
         orm_mode = True
@@ -1,5 +1,6 @@
 from datetime import datetime
-from typing import Optional
+from decimal import Decimal
+from typing import List, Optional
 
 from pydantic import BaseModel
 
@@ -25,9 +26,28 @@ class DepartmentUpdate(BaseModel):
 class DepartmentResponse(DepartmentBase):
     id: int
     manager_name: Optional[str] = None
+    headcount: Optional[int] = None
     deleted: Optional[bool] = None
     created_at: Optional[datetime] = None
     updated_at: Optional[datetime] = None
 
     class Config:
         orm_mode = True
+
+
+class DepartmentPayrollTotal(BaseModel):
+    year: int
+    month: int
+    payroll_count: int
+    payroll_total: Decimal
+
+
+class DepartmentStatsResponse(BaseModel):
+    department_id: int
+    department_name: str
+    headcount_active: int = 0
+    headcount_inactive: int = 0
+    headcount_leave: int = 0
+    headcount_total: int = 0
+    avg_base_salary: Optional[Decimal] = None
+    payroll: List[DepartmentPayrollTotal] = []
@@ -0,0 +1,16 @@
+from typing import List
+
+from app.schemas.contracts import ContractResponse
+from app.schemas.employees import EmployeeResponse
+from app.schemas.payrolls import PayrollResponse
+from app.schemas.rewards import RewardResponse
+from app.schemas.timesheets import TimesheetResponse
+from pydantic import BaseModel
+
+
+class EmployeeOverview(BaseModel):
+    employee: EmployeeResponse
+    contracts: List[ContractResponse]
+    payrolls: List[PayrollResponse]
+    rewards: List[RewardResponse]
+    timesheets: List[TimesheetResponse]
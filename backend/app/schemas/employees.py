@@ -1,5 +1,5 @@
 from datetime import date
-from typing import Optional
+from typing import List, Optional
 
 from pydantic import BaseModel, EmailStr
 
@@ -83,3 +83,38 @@ class EmployeeResponse(BaseModel):
 
     class Config:
         orm_mode = True
+
+
+class EmployeeImportError(BaseModel):
+    row: int  # số thứ tự dòng dữ liệu (bắt đầu từ 1, không tính header CSV)
+    code: Optional[str] = None
+    errors: List[str]
+
+
+class EmployeeImportResult(BaseModel):
+    inserted: int
+    failed: int
+    errors: List[EmployeeImportError]
+
+
+class EmployeeBulkFilter(BaseModel):
+    search: Optional[str] = None
+    department_id: Optional[int] = None
+    status_filter: Optional[str] = None
+
+
+class EmployeeBulkSelection(BaseModel):
+    # Chọn nhân viên theo danh sách id và/hoặc theo bộ lọc (giống /employees/)
+    ids: Optional[List[int]] = None
+    filter: Optional[EmployeeBulkFilter] = None
+
+
+class EmployeeBulkChanges(BaseModel):
+    department_id: Optional[int] = None
+    position_id: Optional[int] = None
+    salary_grade_id: Optional[int] = None
+    status: Optional[str] = None
+
+
+class EmployeeBulkUpdate(EmployeeBulkSelection):
+    changes: EmployeeBulkChanges
@@ -1,6 +1,8 @@
+from datetime import datetime
 from decimal import Decimal
 from typing import Optional
 
+from app.schemas.common import PaginatedResponse
 from app.schemas.employees import EmployeeMini
 from pydantic import BaseModel
 
@@ -34,3 +36,44 @@ class PayrollResponse(PayrollBase):
 
     class Config:
         orm_mode = True
+
+
+class PayrollRunResult(BaseModel):
+    month: int
+    year: int
+    standard_hours: int
+    employees: int
+    total_amount: Decimal
+
+
+class PayrollUpsertResult(BaseModel):
+    received: int
+    # rowcount MySQL trả về cho INSERT ... ON DUPLICATE KEY UPDATE
+    # (dòng cập nhật được tính 2 lần)
+    affected_rows: int
+
+
+class PayrollSummary(BaseModel):
+    count: int
+    sum_total: Decimal
+    avg_total: Optional[Decimal] = None
+    min_total: Optional[Decimal] = None
+    max_total: Optional[Decimal] = None
+
+
+class PayrollPage(PaginatedResponse[PayrollResponse]):
+    # Tổng hợp trên toàn bộ kết quả lọc (không chỉ trang hiện tại)
+    summary: PayrollSummary
+
+
+class PayslipJobResponse(BaseModel):
+    job_id: str
+    year: int
+    month: int
+    # pending | running | completed | failed
+    status: str
+    total: int
+    done: int
+    error: Optional[str] = None
+    created_at: datetime
+    finished_at: Optional[datetime] = None
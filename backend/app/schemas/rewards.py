@@ -30,3 +30,15 @@ class RewardResponse(RewardBase):
 
     class Config:
         orm_mode = True
+
+
+class RewardSummary(BaseModel):
+    employee_id: int
+    code: Optional[str] = None
+    full_name: Optional[str] = None
+    reward_count: int
+    reward_total: Decimal
+    discipline_count: int
+    discipline_total: Decimal
+    # reward_total - discipline_total
+    net_amount: Decimal
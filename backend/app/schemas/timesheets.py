@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import Optional
+from typing import List, Optional
 from datetime import date, time
 from decimal import Decimal
 
@@ -27,3 +27,25 @@ class TimesheetResponse(TimesheetBase):
 
     class Config:
         orm_mode = True
+
+
+class TimesheetAck(BaseModel):
+    index: int  # vị trí sự kiện trong mảng gửi lên
+    accepted: bool
+    error: Optional[str] = None
+
+
+class TimesheetBatchResult(BaseModel):
+    received: int
+    accepted: int
+    rejected: int
+    results: List[TimesheetAck]
+
+
+class TimesheetSummary(BaseModel):
+    employee_id: int
+    code: Optional[str] = None
+    full_name: Optional[str] = None
+    days_present: int
+    total_hours: Decimal
+    late_arrivals: int
@@ -0,0 +1,150 @@
+"""
+Danh sách hợp đồng sắp hết hạn (end_date trong N ngày tới).
+
+Snapshot cho cửa sổ lớn nhất (EXPIRY_SNAPSHOT_DAYS) được dựng lại mỗi đêm bởi
+scheduler và sắp theo end_date, nên yêu cầu 30/60/90 ngày chỉ là cắt đầu danh
+sách (bisect), không truy vấn DB. Ghi hợp đồng gọi invalidate() sau commit;
+snapshot của ngày hôm trước cũng bị coi là hết hạn.
+
+invalidate() chỉ có tác dụng trong worker xử lý request ghi, nên sau mỗi
+EXPIRY_SNAPSHOT_TTL giây snapshot được so lại với version dữ liệu (số hợp đồng,
+MAX(updated_at) của hợp đồng và nhân viên - xóa mềm / đổi tên nhân viên đều
+bump updated_at) bằng 1 truy vấn nhỏ, khác thì dựng lại.
+"""
+import os
+import threading
+import time
+from bisect import bisect_right
+from datetime import date, timedelta
+from typing import List, Optional
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session, joinedload
+
+from app.database import SessionLocal
+from app.models.employees import Employee
+from app.models.labor_contracts import LaborContract
+
+EXPIRY_SNAPSHOT_DAYS = int(os.getenv("EXPIRY_SNAPSHOT_DAYS", "90"))
+EXPIRY_SNAPSHOT_HOUR = int(os.getenv("EXPIRY_SNAPSHOT_HOUR", "0"))
+EXPIRY_SNAPSHOT_TTL = int(os.getenv("EXPIRY_SNAPSHOT_TTL", "30"))  # giây
+
+
+def data_version(db: Session) -> tuple:
+    contract_count, contract_updated_at = db.query(
+        func.count(LaborContract.id), func.max(LaborContract.updated_at)
+    ).one()
+    employee_updated_at = db.query(func.max(Employee.updated_at)).scalar()
+    return contract_count, contract_updated_at, employee_updated_at
+
+
+def load_expiring(db: Session, today: date, within_days: int) -> List[dict]:
+    contracts = (
+        db.query(LaborContract)
+        .join(Employee, LaborContract.employee_id == Employee.id)
+        .options(joinedload(LaborContract.employee))
+        .filter(
+            LaborContract.end_date.between(today, today + timedelta(days=within_days)),
+            Employee.deleted == False,
+        )
+        .order_by(LaborContract.end_date, LaborContract.id)
+        .all()
+    )
+
+    return [
+        {
+            "id": c.id,
+            "employee_id": c.employee_id,
+            "contract_type": c.contract_type,
+            "salary": c.salary,
+            "start_date": c.start_date,
+            "end_date": c.end_date,
+            "file_url": c.file_url,
+            "file_name": c.file_name,
+            "file_size": c.file_size,
+            "content_type": c.content_type,
+            "employee": {"id": c.employee.id, "full_name": c.employee.full_name},
+            "days_left": (c.end_date - today).days,
+        }
+        for c in contracts
+    ]
+
+
+class ExpiringContractsSnapshot:
+    def __init__(self, max_days: int = EXPIRY_SNAPSHOT_DAYS, ttl: int = EXPIRY_SNAPSHOT_TTL):
+        self._max_days = max_days
+        self._ttl = ttl
+        self._lock = threading.Lock()
+        self._version = 0
+        self._items: Optional[List[dict]] = None
+        self._end_dates: List[date] = []
+        self._as_of: Optional[date] = None
+        self._data_version = None
+        self._checked_at = 0.0
+
+    def invalidate(self):
+        with self._lock:
+            self._version += 1
+            self._items = None
+
+    def refresh(self, db: Session):
+        with self._lock:
+            version = self._version
+
+        today = date.today()
+        # Lấy version trước khi nạp: thay đổi xảy ra trong lúc nạp sẽ bị phát
+        # hiện ở lần kiểm tra sau
+        current = data_version(db)
+        items = load_expiring(db, today, self._max_days)
+
+        with self._lock:
+            if self._version == version:
+                self._items = items
+                self._end_dates = [item["end_date"] for item in items]
+                self._as_of = today
+                self._data_version = current
+                self._checked_at = time.monotonic()
+        return items
+
+    def _is_stale(self, db: Session) -> bool:
+        with self._lock:
+            if self._items is None or self._as_of != date.today():
+                return True
+            if time.monotonic() - self._checked_at < self._ttl:
+                return False
+            known = self._data_version
+
+        if data_version(db) != known:
+            return True
+
+        with self._lock:
+            self._checked_at = time.monotonic()
+        return False
+
+    def get(self, db: Session, within_days: int) -> List[dict]:
+        today = date.today()
+        if within_days > self._max_days:
+            return load_expiring(db, today, within_days)
+
+        items = None
+        if not self._is_stale(db):
+            with self._lock:
+                items, end_dates = self._items, self._end_dates
+
+        if items is None:  # hết hạn, hoặc vừa bị invalidate() bởi request khác
+            items = self.refresh(db)
+            end_dates = [item["end_date"] for item in items]
+
+        return items[:bisect_right(end_dates, today + timedelta(days=within_days))]
+
+
+expiring_contracts = ExpiringContractsSnapshot()
+
+
+def refresh_snapshot():
+    # Job chạy hằng đêm của scheduler
+    db = SessionLocal()
+    try:
+        expiring_contracts.refresh(db)
+    finally:
+        db.close()
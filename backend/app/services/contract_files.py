@@ -0,0 +1,149 @@
+"""
+Kho file hợp đồng theo địa chỉ nội dung (content-addressed).
+
+- File được lưu tại CONTRACT_FILE_DIR/<2 ký tự đầu sha256>/<sha256>: cùng nội
+  dung chỉ lưu 1 lần dù gắn cho nhiều hợp đồng.
+- Upload được ghi ra file tạm theo từng chunk (vừa ghi vừa tính hash), không
+  giữ cả file trong bộ nhớ; ghi đĩa chạy trong threadpool.
+- Đưa file tạm vào kho + commit DB (store_blob) và xóa file không còn hợp
+  đồng nào dùng (remove_if_unreferenced) chạy dưới cùng 1 khóa theo sha256
+  (MySQL GET_LOCK, có hiệu lực giữa các worker process) => không xóa nhầm
+  blob mà 1 upload khác vừa dedupe vào nhưng chưa commit.
+"""
+import hashlib
+import os
+import uuid
+from contextlib import contextmanager
+from typing import AsyncIterator, Callable, Iterator, Tuple
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.database import engine
+from app.models.labor_contracts import LaborContract
+
+CONTRACT_FILE_DIR = os.getenv("CONTRACT_FILE_DIR", os.path.join("storage", "contracts"))
+CONTRACT_FILE_MAX_BYTES = int(os.getenv("CONTRACT_FILE_MAX_BYTES", str(50 * 1024 * 1024)))
+WRITE_CHUNK_SIZE = 1024 * 1024
+READ_CHUNK_SIZE = 64 * 1024
+BLOB_LOCK_TIMEOUT = int(os.getenv("CONTRACT_FILE_LOCK_TIMEOUT", "10"))  # giây
+
+
+class FileTooLargeError(Exception):
+    pass
+
+
+class BlobLockTimeout(Exception):
+    pass
+
+
+def path_for(sha256: str) -> str:
+    return os.path.join(CONTRACT_FILE_DIR, sha256[:2], sha256)
+
+
+@contextmanager
+def blob_lock(sha256: str):
+    # Connection riêng: khóa GET_LOCK gắn với connection, còn Session trả
+    # connection về pool mỗi lần commit. Tên khóa tối đa 64 ký tự.
+    name = f"contract_file:{sha256[:40]}"
+    with engine.connect() as conn:
+        acquired = conn.execute(
+            text("SELECT GET_LOCK(:name, :timeout)"),
+            {"name": name, "timeout": BLOB_LOCK_TIMEOUT},
+        ).scalar()
+        if acquired != 1:
+            raise BlobLockTimeout()
+        try:
+            yield
+        finally:
+            conn.execute(text("SELECT RELEASE_LOCK(:name)"), {"name": name})
+
+
+async def save_stream(chunks: AsyncIterator[bytes]) -> Tuple[str, int, str]:
+    """Ghi luồng dữ liệu ra file tạm, trả về (sha256, số byte, đường dẫn file tạm)."""
+    tmp_dir = os.path.join(CONTRACT_FILE_DIR, "tmp")
+    os.makedirs(tmp_dir, exist_ok=True)
+    tmp_path = os.path.join(tmp_dir, uuid.uuid4().hex)
+
+    digest = hashlib.sha256()
+    size = 0
+    buffer = bytearray()
+    f = await run_in_threadpool(open, tmp_path, "wb")
+    try:
+        async for chunk in chunks:
+            size += len(chunk)
+            if size > CONTRACT_FILE_MAX_BYTES:
+                raise FileTooLargeError()
+            digest.update(chunk)
+            buffer.extend(chunk)
+            # Gom thành ~1MB rồi mới ghi để không tốn 1 lần chuyển thread / chunk nhỏ
+            if len(buffer) >= WRITE_CHUNK_SIZE:
+                await run_in_threadpool(f.write, bytes(buffer))
+                buffer.clear()
+        if buffer:
+            await run_in_threadpool(f.write, bytes(buffer))
+        await run_in_threadpool(f.close)
+    except BaseException:
+        f.close()
+        os.remove(tmp_path)
+        raise
+
+    return digest.hexdigest(), size, tmp_path
+
+
+def discard_tmp(tmp_path: str):
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+
+
+def _remove_blob_unlocked(db: Session, sha256: str):
+    in_use = db.query(LaborContract.id).filter(LaborContract.file_sha256 == sha256).first()
+    if not in_use and os.path.exists(path_for(sha256)):
+        os.remove(path_for(sha256))
+
+
+def store_blob(db: Session, sha256: str, tmp_path: str, attach: Callable[[], object]):
+    """
+    Đưa file tạm vào kho rồi gọi attach() (ghi + commit DB) trong cùng khóa.
+    attach() lỗi => rollback và xóa blob nếu không hợp đồng nào khác dùng.
+    """
+    with blob_lock(sha256):
+        final_path = path_for(sha256)
+        if os.path.exists(final_path):
+            discard_tmp(tmp_path)  # đã có file cùng nội dung
+        else:
+            os.makedirs(os.path.dirname(final_path), exist_ok=True)
+            os.replace(tmp_path, final_path)
+
+        try:
+            return attach()
+        except Exception:
+            db.rollback()
+            _remove_blob_unlocked(db, sha256)
+            raise
+
+
+def remove_if_unreferenced(db: Session, sha256: str):
+    # Gọi sau commit: chỉ xóa khi không còn hợp đồng nào dùng file này.
+    # Không lấy được khóa => bỏ qua (chỉ để lại file thừa, không mất dữ liệu)
+    if not sha256:
+        return
+    try:
+        with blob_lock(sha256):
+            _remove_blob_unlocked(db, sha256)
+    except BlobLockTimeout:
+        pass
+
+
+def iter_file(path: str, start: int, end: int) -> Iterator[bytes]:
+    """Đọc đoạn [start, end] của file theo chunk (Starlette chạy generator này trong threadpool)."""
+    with open(path, "rb") as f:
+        f.seek(start)
+        remaining = end - start + 1
+        while remaining > 0:
+            chunk = f.read(min(READ_CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
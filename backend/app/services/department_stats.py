@@ -0,0 +1,201 @@
+"""
+Duy trì bảng tổng hợp department_stats / department_payroll_stats.
+
+- Luồng ghi đơn lẻ (tạo / sửa / xóa 1 nhân viên hoặc 1 bảng lương) gọi
+  apply_* để cộng dồn chênh lệch bằng INSERT ... ON DUPLICATE KEY UPDATE
+  (cộng nguyên tử, không đọc-sửa-ghi).
+- Luồng ghi hàng loạt gọi rebuild_* cho đúng phạm vi bị ảnh hưởng (set-based).
+- Các hàm chỉ thêm câu lệnh vào transaction hiện tại, caller tự commit.
+
+Bảng lương được tính cho phòng ban hiện tại của nhân viên.
+"""
+from collections import defaultdict
+from decimal import Decimal
+from typing import Iterable, Optional, Tuple
+
+from sqlalchemy import case, delete, func, insert, select
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.orm import Session
+
+from app.models.department_stats import DepartmentPayrollStats, DepartmentStats
+from app.models.employees import Employee
+from app.models.payrolls import Payroll
+from app.models.salary_grades import SalaryGrade
+
+# (department_id, status, salary_grade_id) của 1 nhân viên còn hoạt động,
+# None nếu nhân viên không tồn tại / đã xóa mềm
+EmployeeSnapshot = Optional[Tuple[Optional[int], Optional[str], Optional[int]]]
+
+HEADCOUNT_COLUMNS = {
+    "active": "headcount_active",
+    "inactive": "headcount_inactive",
+    "leave": "headcount_leave",
+}
+
+
+def employee_snapshot(emp: Optional[Employee]) -> EmployeeSnapshot:
+    if emp is None or emp.deleted:
+        return None
+    return (emp.department_id, emp.status or "active", emp.salary_grade_id)
+
+
+def _upsert_increment(db: Session, model, keys: dict, deltas: dict):
+    stmt = mysql_insert(model).values(**keys, **deltas, updated_at=func.utc_timestamp())
+    stmt = stmt.on_duplicate_key_update(
+        updated_at=stmt.inserted.updated_at,
+        **{
+            column: getattr(model, column) + getattr(stmt.inserted, column)
+            for column in deltas
+        },
+    )
+    db.execute(stmt)
+
+
+def apply_employee_change(db: Session, before: EmployeeSnapshot, after: EmployeeSnapshot):
+    if before == after:
+        return
+
+    grade_ids = {snap[2] for snap in (before, after) if snap and snap[2]}
+    base_salaries = dict(
+        db.query(SalaryGrade.id, SalaryGrade.base_salary).filter(SalaryGrade.id.in_(grade_ids))
+    ) if grade_ids else {}
+
+    deltas = defaultdict(lambda: defaultdict(int))
+    for snap, sign in ((before, -1), (after, 1)):
+        if not snap or not snap[0]:
+            continue
+        department_id, emp_status, grade_id = snap
+        column = HEADCOUNT_COLUMNS.get(emp_status)
+        if column:
+            deltas[department_id][column] += sign
+        if grade_id in base_salaries:
+            deltas[department_id]["graded_count"] += sign
+            deltas[department_id]["base_salary_sum"] += sign * (base_salaries[grade_id] or Decimal(0))
+
+    for department_id, values in deltas.items():
+        values = {column: value for column, value in values.items() if value}
+        if values:
+            _upsert_increment(db, DepartmentStats, {"department_id": department_id}, values)
+
+
+def apply_payroll_change(
+    db: Session,
+    employee_id: int,
+    year: int,
+    month: int,
+    total_delta: Decimal,
+    count_delta: int,
+):
+    department_id = (
+        db.query(Employee.department_id).filter(Employee.id == employee_id).scalar()
+    )
+    if not department_id or (not total_delta and not count_delta):
+        return
+
+    _upsert_increment(
+        db,
+        DepartmentPayrollStats,
+        {"department_id": department_id, "year": year, "month": month},
+        {"payroll_total": total_delta or 0, "payroll_count": count_delta},
+    )
+
+
+def rebuild_department_stats(db: Session, department_ids: Optional[Iterable[int]] = None):
+    """Tính lại headcount / lương cơ bản (toàn bộ hoặc chỉ các phòng ban chỉ định)."""
+    if department_ids is not None:
+        department_ids = {dept_id for dept_id in department_ids if dept_id}
+        if not department_ids:
+            return
+
+    clear = delete(DepartmentStats)
+    source = (
+        select(
+            Employee.department_id,
+            func.sum(case((Employee.status == "active", 1), else_=0)),
+            func.sum(case((Employee.status == "inactive", 1), else_=0)),
+            func.sum(case((Employee.status == "leave", 1), else_=0)),
+            func.count(SalaryGrade.id),
+            func.coalesce(func.sum(SalaryGrade.base_salary), 0),
+            func.utc_timestamp(),
+        )
+        .select_from(Employee)
+        .outerjoin(SalaryGrade, Employee.salary_grade_id == SalaryGrade.id)
+        .where(Employee.deleted == False, Employee.department_id.isnot(None))
+        .group_by(Employee.department_id)
+    )
+
+    if department_ids is not None:
+        clear = clear.where(DepartmentStats.department_id.in_(department_ids))
+        source = source.where(Employee.department_id.in_(department_ids))
+
+    db.execute(clear)
+    db.execute(
+        insert(DepartmentStats).from_select(
+            [
+                "department_id",
+                "headcount_active",
+                "headcount_inactive",
+                "headcount_leave",
+                "graded_count",
+                "base_salary_sum",
+                "updated_at",
+            ],
+            source,
+        )
+    )
+
+
+def rebuild_payroll_stats(
+    db: Session,
+    year: Optional[int] = None,
+    month: Optional[int] = None,
+    department_ids: Optional[Iterable[int]] = None,
+):
+    """
+    Tính lại tổng bảng lương theo phòng ban (toàn bộ, theo năm / tháng, hoặc
+    chỉ các phòng ban chỉ định - vd: khi nhân viên chuyển phòng ban, bảng lương
+    cũ của họ chuyển theo sang phòng ban mới).
+    """
+    if department_ids is not None:
+        department_ids = {dept_id for dept_id in department_ids if dept_id}
+        if not department_ids:
+            return
+
+    clear = delete(DepartmentPayrollStats)
+    source = (
+        select(
+            Employee.department_id,
+            Payroll.year,
+            Payroll.month,
+            func.count(Payroll.id),
+            func.coalesce(func.sum(Payroll.total_salary), 0),
+            func.utc_timestamp(),
+        )
+        .select_from(Payroll)
+        .join(Employee, Payroll.employee_id == Employee.id)
+        .where(Employee.department_id.isnot(None))
+        .group_by(Employee.department_id, Payroll.year, Payroll.month)
+    )
+
+    if year is not None:
+        clear = clear.where(DepartmentPayrollStats.year == year)
+        source = source.where(Payroll.year == year)
+    if month is not None:
+        clear = clear.where(DepartmentPayrollStats.month == month)
+        source = source.where(Payroll.month == month)
+    if department_ids is not None:
+        clear = clear.where(DepartmentPayrollStats.department_id.in_(department_ids))
+        source = source.where(Employee.department_id.in_(department_ids))
+
+    db.execute(clear)
+    db.execute(
+        insert(DepartmentPayrollStats).from_select(
+            ["department_id", "year", "month", "payroll_count", "payroll_total", "updated_at"],
+            source,
+        )
+    )
+
+
+def rebuild_all(db: Session):
+    rebuild_department_stats(db)
+    rebuild_payroll_stats(db)
@@ -0,0 +1,112 @@
+"""
+Băm / kiểm tra mật khẩu bcrypt trên executor riêng, tách khỏi threadpool xử
+lý request (bcrypt chiếm ~100-300ms CPU mỗi lần, đợt đăng nhập lúc 9h sáng
+sẽ chiếm hết threadpool nếu chạy trực tiếp trong endpoint).
+
+- Tối đa PASSWORD_HASH_WORKERS phép băm chạy đồng thời.
+- Request vượt quá được xếp hàng (tối đa PASSWORD_HASH_MAX_QUEUE), chờ quá
+  PASSWORD_HASH_QUEUE_TIMEOUT giây hoặc hàng đợi đầy => 503 + Retry-After.
+- metrics(): độ dài hàng đợi, số đang chạy, p50 / p99 thời gian băm.
+
+Các biến đếm chỉ được đổi trong event loop nên không cần lock.
+"""
+import asyncio
+import os
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+from fastapi import HTTPException, status
+
+from app.utils.password import hash_password, verify_password
+
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", "2"))
+PASSWORD_HASH_MAX_QUEUE = int(os.getenv("PASSWORD_HASH_MAX_QUEUE", "200"))
+PASSWORD_HASH_QUEUE_TIMEOUT = float(os.getenv("PASSWORD_HASH_QUEUE_TIMEOUT", "10"))
+DURATION_SAMPLES = 1000
+
+
+def _percentile(values, percent: float) -> Optional[float]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = min(int(round(percent / 100 * (len(ordered) - 1))), len(ordered) - 1)
+    return ordered[index]
+
+
+class PasswordHasher:
+    def __init__(
+        self,
+        workers: int = PASSWORD_HASH_WORKERS,
+        max_queue: int = PASSWORD_HASH_MAX_QUEUE,
+        queue_timeout: float = PASSWORD_HASH_QUEUE_TIMEOUT,
+    ):
+        self._workers = workers
+        self._max_queue = max_queue
+        self._queue_timeout = queue_timeout
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="password-hash")
+        self._slots: Optional[asyncio.Semaphore] = None  # tạo trong event loop
+        self._waiting = 0
+        self._running = 0
+        self._rejected = 0
+        self._durations = deque(maxlen=DURATION_SAMPLES)
+
+    def _busy(self):
+        self._rejected += 1
+        return HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Hệ thống đang bận, vui lòng thử lại sau",
+            headers={"Retry-After": "1"},
+        )
+
+    async def _run(self, func, *args):
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self._workers)
+
+        if self._waiting >= self._max_queue:
+            raise self._busy()
+
+        self._waiting += 1
+        try:
+            await asyncio.wait_for(self._slots.acquire(), self._queue_timeout)
+        except asyncio.TimeoutError:
+            raise self._busy()
+        finally:
+            self._waiting -= 1
+
+        self._running += 1
+        started = time.perf_counter()
+        try:
+            return await asyncio.wrap_future(self._executor.submit(func, *args))
+        finally:
+            self._durations.append(time.perf_counter() - started)
+            self._running -= 1
+            self._slots.release()
+
+    async def hash(self, password: str) -> str:
+        return await self._run(hash_password, password)
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return await self._run(verify_password, plain_password, hashed_password)
+
+    def metrics(self) -> dict:
+        durations = list(self._durations)
+        p50 = _percentile(durations, 50)
+        p99 = _percentile(durations, 99)
+        return {
+            "workers": self._workers,
+            "running": self._running,
+            "queue_depth": self._waiting,
+            "max_queue": self._max_queue,
+            "rejected": self._rejected,
+            "samples": len(durations),
+            "p50_ms": round(p50 * 1000, 1) if p50 is not None else None,
+            "p99_ms": round(p99 * 1000, 1) if p99 is not None else None,
+        }
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False)
+
+
+password_hasher = PasswordHasher()
@@ -0,0 +1,117 @@
+"""
+Tính bảng lương tháng cho toàn bộ nhân viên bằng 1 câu INSERT ... SELECT.
+
+    base_salary  = SalaryGrade.base_salary * coefficient * tỉ lệ công
+    tỉ lệ công   = min(SUM(working_hours) / số giờ chuẩn của tháng, 1)
+    bonus        = SUM(amount) các khoản thưởng trong tháng
+    penalty      = SUM(amount) các khoản kỷ luật trong tháng
+    total_salary = base_salary + allowance + bonus - penalty
+
+Tổng giờ công và thưởng/phạt được gom bằng GROUP BY trong subquery, nên số
+câu lệnh không phụ thuộc số nhân viên.
+"""
+import calendar
+from datetime import date
+from decimal import Decimal
+
+from sqlalchemy import DECIMAL, Integer, case, func, insert, literal, select
+from sqlalchemy.orm import Session
+
+from app.models.employees import Employee
+from app.models.payrolls import Payroll
+from app.models.reward_discipline import RewardDiscipline
+from app.models.salary_grades import SalaryGrade
+from app.models.timesheets import Timesheet
+
+STANDARD_HOURS_PER_DAY = 8
+
+PAYROLL_COLUMNS = [
+    "employee_id",
+    "month",
+    "year",
+    "base_salary",
+    "allowance",
+    "bonus",
+    "penalty",
+    "total_salary",
+    "created_at",
+]
+
+
+def month_range(year: int, month: int):
+    return date(year, month, 1), date(year, month, calendar.monthrange(year, month)[1])
+
+
+def standard_hours(year: int, month: int) -> int:
+    # Số ngày làm việc (thứ 2 - thứ 6) trong tháng * số giờ chuẩn mỗi ngày
+    days = calendar.monthrange(year, month)[1]
+    working_days = sum(1 for day in range(1, days + 1) if date(year, month, day).weekday() < 5)
+    return working_days * STANDARD_HOURS_PER_DAY
+
+
+def payroll_source(year: int, month: int, allowance: Decimal = Decimal(0), prorate: bool = True):
+    """SELECT trả về đúng các cột PAYROLL_COLUMNS cho mọi nhân viên đang làm việc."""
+    start, end = month_range(year, month)
+
+    hours = (
+        select(
+            Timesheet.employee_id.label("employee_id"),
+            func.sum(Timesheet.working_hours).label("hours"),
+        )
+        .where(Timesheet.date.between(start, end))
+        .group_by(Timesheet.employee_id)
+        .subquery()
+    )
+
+    rewards = (
+        select(
+            RewardDiscipline.employee_id.label("employee_id"),
+            func.sum(
+                case((RewardDiscipline.type == "reward", RewardDiscipline.amount), else_=0)
+            ).label("bonus"),
+            func.sum(
+                case((RewardDiscipline.type == "discipline", RewardDiscipline.amount), else_=0)
+            ).label("penalty"),
+        )
+        .where(RewardDiscipline.date.between(start, end))
+        .group_by(RewardDiscipline.employee_id)
+        .subquery()
+    )
+
+    base = SalaryGrade.base_salary * SalaryGrade.coefficient
+    if prorate:
+        base = base * func.least(
+            func.coalesce(hours.c.hours, 0) / standard_hours(year, month), 1
+        )
+    base = func.round(base, 2)
+
+    allowance_value = literal(allowance, DECIMAL(12, 2))
+    bonus = func.coalesce(rewards.c.bonus, 0)
+    penalty = func.coalesce(rewards.c.penalty, 0)
+
+    return (
+        select(
+            Employee.id,
+            literal(month, Integer),
+            literal(year, Integer),
+            base,
+            allowance_value,
+            bonus,
+            penalty,
+            base + allowance_value + bonus - penalty,
+            func.utc_timestamp(),
+        )
+        .select_from(Employee)
+        .join(SalaryGrade, Employee.salary_grade_id == SalaryGrade.id)
+        .outerjoin(hours, hours.c.employee_id == Employee.id)
+        .outerjoin(rewards, rewards.c.employee_id == Employee.id)
+        .where(Employee.deleted == False, Employee.status != "inactive")
+    )
+
+
+def run_payroll(db: Session, year: int, month: int, allowance: Decimal = Decimal(0), prorate: bool = True) -> int:
+    """Ghi bảng lương tháng, trả về số dòng đã ghi. Caller tự commit."""
+    result = db.execute(
+        insert(Payroll).from_select(PAYROLL_COLUMNS, payroll_source(year, month, allowance, prorate))
+    )
+    return result.rowcount
@@ -0,0 +1,234 @@
+"""
+Sinh phiếu lương (HTML) cho toàn bộ bảng lương của 1 tháng ở chế độ nền.
+
+- Endpoint chỉ tạo job rồi trả về ngay; 1 thread điều phối đọc bảng lương
+  bằng server-side cursor, chia thành từng lô và đẩy sang process pool để
+  render (CPU-bound, không chiếm thread xử lý request / GIL của API).
+- Số lô đang chờ trong pool bị giới hạn để bộ nhớ không tăng theo số dòng.
+- Trạng thái job được ghi ra job.json trong thư mục của job, nên worker
+  uvicorn nào cũng đọc được tiến độ và tải được file ZIP.
+"""
+import html
+import json
+import os
+import threading
+import uuid
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import List, Optional
+
+from sqlalchemy import select
+
+from app.database import SessionLocal
+from app.models.departments import Department
+from app.models.employees import Employee
+from app.models.payrolls import Payroll
+
+PAYSLIP_STORAGE_DIR = os.getenv("PAYSLIP_STORAGE_DIR", os.path.join("storage", "payslips"))
+PAYSLIP_WORKERS = int(os.getenv("PAYSLIP_WORKERS", str(os.cpu_count() or 2)))
+PAYSLIP_CHUNK_SIZE = int(os.getenv("PAYSLIP_CHUNK_SIZE", "500"))
+
+_executor: Optional[ProcessPoolExecutor] = None
+_executor_lock = threading.Lock()
+_jobs = {}
+_jobs_lock = threading.Lock()
+
+PAYSLIP_TEMPLATE = """<!DOCTYPE html>
+<html lang="vi">
+<head><meta charset="utf-8"><title>Phiếu lương {code} - {month:02d}/{year}</title></head>
+<body>
+<h2>PHIẾU LƯƠNG THÁNG {month:02d}/{year}</h2>
+<p>Nhân viên: <b>{full_name}</b> ({code})<br>Phòng ban: {department}</p>
+<table border="1" cellpadding="6" cellspacing="0">
+<tr><td>Lương cơ bản</td><td align="right">{base_salary}</td></tr>
+<tr><td>Phụ cấp</td><td align="right">{allowance}</td></tr>
+<tr><td>Thưởng</td><td align="right">{bonus}</td></tr>
+<tr><td>Phạt</td><td align="right">{penalty}</td></tr>
+<tr><th>Thực lĩnh</th><th align="right">{total_salary}</th></tr>
+</table>
+</body>
+</html>
+"""
+
+MONEY_FIELDS = ("base_salary", "allowance", "bonus", "penalty", "total_salary")
+
+
+def _money(value) -> str:
+    return f"{float(value or 0):,.0f}"
+
+
+def render_chunk(rows: List[dict], out_dir: str) -> int:
+    """Chạy trong process con: render và ghi file cho 1 lô phiếu lương."""
+    for row in rows:
+        values = {
+            "code": html.escape(row["code"] or ""),
+            "full_name": html.escape(row["full_name"] or ""),
+            "department": html.escape(row["department"] or ""),
+            "year": row["year"],
+            "month": row["month"],
+        }
+        values.update({field: _money(row[field]) for field in MONEY_FIELDS})
+
+        file_name = f"payslip_{row['year']}_{row['month']:02d}_{row['employee_id']}.html"
+        with open(os.path.join(out_dir, file_name), "w", encoding="utf-8") as f:
+            f.write(PAYSLIP_TEMPLATE.format(**values))
+
+    return len(rows)
+
+
+def _get_executor() -> ProcessPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ProcessPoolExecutor(max_workers=PAYSLIP_WORKERS)
+        return _executor
+
+
+def shutdown():
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False, cancel_futures=True)
+            _executor = None
+
+
+def _job_dir(job_id: str) -> str:
+    return os.path.join(PAYSLIP_STORAGE_DIR, job_id)
+
+
+def zip_path(job_id: str) -> str:
+    return os.path.join(PAYSLIP_STORAGE_DIR, f"{job_id}.zip")
+
+
+def _save(job: dict):
+    path = os.path.join(_job_dir(job["job_id"]), "job.json")
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(job, f, default=str)
+    os.replace(tmp_path, path)
+
+
+def _update(job_id: str, **changes) -> dict:
+    with _jobs_lock:
+        job = _jobs[job_id]
+        job.update(changes)
+        snapshot = dict(job)
+        _save(snapshot)
+    return snapshot
+
+
+def get_job(job_id: str) -> Optional[dict]:
+    with _jobs_lock:
+        if job_id in _jobs:
+            return dict(_jobs[job_id])
+
+    # Job do worker khác tạo: đọc trạng thái từ file
+    path = os.path.join(_job_dir(os.path.basename(job_id)), "job.json")
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def start_job(year: int, month: int) -> dict:
+    job_id = uuid.uuid4().hex
+    os.makedirs(_job_dir(job_id), exist_ok=True)
+
+    job = {
+        "job_id": job_id,
+        "year": year,
+        "month": month,
+        "status": "pending",
+        "total": 0,
+        "done": 0,
+        "error": None,
+        "created_at": datetime.utcnow(),
+        "finished_at": None,
+    }
+    with _jobs_lock:
+        _jobs[job_id] = job
+        _save(job)
+
+    threading.Thread(target=_run_job, args=(job_id, year, month), daemon=True).start()
+    return dict(job)
+
+
+def _payroll_rows_statement(year: int, month: int):
+    return (
+        select(
+            Payroll.employee_id,
+            Payroll.year,
+            Payroll.month,
+            Payroll.base_salary,
+            Payroll.allowance,
+            Payroll.bonus,
+            Payroll.penalty,
+            Payroll.total_salary,
+            Employee.code,
+            Employee.full_name,
+            Department.name.label("department"),
+        )
+        .join(Employee, Payroll.employee_id == Employee.id)
+        .outerjoin(Department, Employee.department_id == Department.id)
+        .where(Payroll.year == year, Payroll.month == month)
+        .order_by(Payroll.id)
+    )
+
+
+def _run_job(job_id: str, year: int, month: int):
+    out_dir = _job_dir(job_id)
+    executor = _get_executor()
+    # Tối đa 2 lô / worker nằm trong hàng đợi của pool
+    in_flight = threading.BoundedSemaphore(PAYSLIP_WORKERS * 2)
+    futures = []
+    # done: số phiếu đã render; settled: số lô đã chạy xong callback
+    progress = threading.Condition()
+    state = {"done": 0, "settled": 0}
+
+    def on_done(future):
+        in_flight.release()
+        with progress:
+            # Ghi tiến độ ngay trong lock để giá trị đọc được không bị lùi
+            if not future.cancelled() and future.exception() is None:
+                state["done"] += future.result()
+                _update(job_id, done=state["done"])
+            state["settled"] += 1
+            progress.notify_all()
+
+    db = SessionLocal()
+    try:
+        total = (
+            db.query(Payroll.id).filter(Payroll.year == year, Payroll.month == month).count()
+        )
+        _update(job_id, status="running", total=total)
+
+        result = db.execute(
+            _payroll_rows_statement(year, month).execution_options(
+                stream_results=True, yield_per=PAYSLIP_CHUNK_SIZE
+            )
+        )
+        for rows in result.partitions():
+            in_flight.acquire()
+            future = executor.submit(render_chunk, [dict(row._mapping) for row in rows], out_dir)
+            future.add_done_callback(on_done)
+            futures.append(future)
+
+        # future.result() có thể trả về trước khi callback chạy: chờ mọi callback
+        # xong rồi mới chốt trạng thái, để không bị ghi đè sau "completed"
+        with progress:
+            progress.wait_for(lambda: state["settled"] == len(futures))
+
+        for future in futures:
+            future.result()  # ném lại lỗi của process con (nếu có)
+
+        with zipfile.ZipFile(zip_path(job_id), "w", zipfile.ZIP_DEFLATED) as bundle:
+            for file_name in sorted(os.listdir(out_dir)):
+                if file_name.endswith(".html"):
+                    bundle.write(os.path.join(out_dir, file_name), arcname=file_name)
+
+        _update(job_id, status="completed", finished_at=datetime.utcnow())
+    except Exception as exc:  # job nền: ghi lỗi vào trạng thái thay vì làm chết thread
+        _update(job_id, status="failed", error=str(exc), finished_at=datetime.utcnow())
+    finally:
+        db.close()
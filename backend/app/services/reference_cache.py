@@ -0,0 +1,149 @@
+"""
+Cache trong process cho dữ liệu danh mục (phòng ban, chức vụ, bậc lương).
+
+- Mỗi cache giữ toàn bộ bảng (kể cả bản ghi đã xóa mềm, để tra id -> tên cho
+  dữ liệu cũ) dưới dạng dict đã map sẵn cho response.
+- Router gọi invalidate() SAU khi commit; mỗi lần invalidate tăng version để
+  lần nạp đang chạy dở (đọc dữ liệu cũ) không ghi đè lên cache.
+- TTL giới hạn độ trễ giữa các worker process (không chia sẻ bộ nhớ).
+- digest là hash nội dung, dùng làm ETag: giống nhau giữa các worker.
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+from sqlalchemy.orm import Session
+
+from app.models.departments import Department
+from app.models.positions import Position
+from app.models.salary_grades import SalaryGrade
+
+REFERENCE_CACHE_TTL = int(os.getenv("REFERENCE_CACHE_TTL", "300"))  # giây
+
+
+def content_digest(data) -> str:
+    raw = json.dumps(data, default=str, sort_keys=True)
+    return hashlib.sha1(raw.encode()).hexdigest()
+
+
+class ReferenceCache:
+    def __init__(self, loader: Callable[[Session], List[dict]], ttl: int = REFERENCE_CACHE_TTL):
+        self._loader = loader
+        self._ttl = ttl
+        self._lock = threading.Lock()
+        self._version = 0
+        self._items: Optional[List[dict]] = None
+        self._by_id: Dict[int, dict] = {}
+        self._digest = ""
+        self._expires_at = 0.0
+
+    def invalidate(self):
+        with self._lock:
+            self._version += 1
+            self._items = None
+
+    def _snapshot(self, db: Session):
+        with self._lock:
+            if self._items is not None and time.monotonic() < self._expires_at:
+                return self._items, self._by_id, self._digest
+            version = self._version
+
+        # Nạp ngoài lock để không chặn các request đọc khác
+        items = self._loader(db)
+        by_id = {item["id"]: item for item in items}
+        digest = content_digest(items)
+
+        with self._lock:
+            if self._version == version:
+                self._items = items
+                self._by_id = by_id
+                self._digest = digest
+                self._expires_at = time.monotonic() + self._ttl
+
+        return items, by_id, digest
+
+    def all(self, db: Session, include_deleted: bool = False) -> List[dict]:
+        items = self._snapshot(db)[0]
+        if include_deleted:
+            return items
+        return [item for item in items if not item.get("deleted")]
+
+    def get(self, db: Session, item_id: Optional[int], include_deleted: bool = False) -> Optional[dict]:
+        if item_id is None:
+            return None
+        item = self._snapshot(db)[1].get(item_id)
+        if item and item.get("deleted") and not include_deleted:
+            return None
+        return item
+
+    def lookup(self, db: Session) -> Dict[int, dict]:
+        """Bảng id -> bản ghi (kể cả đã xóa mềm) để router khác tra tên."""
+        return self._snapshot(db)[1]
+
+    def digest(self, db: Session) -> str:
+        return self._snapshot(db)[2]
+
+
+def _load_departments(db: Session) -> List[dict]:
+    # Chỉ cột của bảng departments: số nhân viên / tên trưởng phòng thay đổi theo
+    # từng lần ghi nhân viên nên được gắn theo request (departments_router)
+    return [
+        {
+            "id": dept.id,
+            "name": dept.name,
+            "description": dept.description,
+            "phone": dept.phone,
+            "manager_id": dept.manager_id,
+            "deleted": dept.deleted,
+            "created_at": dept.created_at,
+            "updated_at": dept.updated_at,
+        }
+        for dept in db.query(Department).order_by(Department.id.desc())
+    ]
+
+
+def _load_positions(db: Session) -> List[dict]:
+    return [
+        {
+            "id": pos.id,
+            "name": pos.name,
+            "description": pos.description,
+            "level": pos.level,
+            "deleted": pos.deleted,
+        }
+        for pos in db.query(Position).order_by(Position.id.desc())
+    ]
+
+
+def _load_salary_grades(db: Session) -> List[dict]:
+    return [
+        {
+            "id": grade.id,
+            "grade_name": grade.grade_name,
+            "base_salary": grade.base_salary,
+            "coefficient": grade.coefficient,
+            "deleted": grade.deleted,
+        }
+        for grade in db.query(SalaryGrade).order_by(SalaryGrade.id.desc())
+    ]
+
+
+departments_cache = ReferenceCache(_load_departments)
+positions_cache = ReferenceCache(_load_positions)
+salary_grades_cache = ReferenceCache(_load_salary_grades)
+
+
+def paginate(items: List[dict], page: int, page_size: int) -> List[dict]:
+    skip = (page - 1) * page_size
+    return items[skip:skip + page_size]
+
+
+def search_items(items: List[dict], field: str, search: Optional[str]) -> List[dict]:
+    # Tương đương LIKE '%x%' với collation không phân biệt hoa thường
+    if not search:
+        return items
+    needle = search.lower()
+    return [item for item in items if needle in (item.get(field) or "").lower()]
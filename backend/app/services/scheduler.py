@@ -0,0 +1,64 @@
+"""
+Bộ lập lịch đơn giản chạy trong process: mỗi job chạy 1 lần / ngày vào giờ
+cố định (giờ địa phương của server). Mỗi worker uvicorn có scheduler riêng,
+nên job chỉ nên làm việc trong bộ nhớ của process (vd: dựng lại snapshot).
+"""
+import threading
+import traceback
+from datetime import datetime, timedelta
+from typing import Callable, List
+
+
+class _DailyJob:
+    def __init__(self, name: str, func: Callable[[], None], hour: int, minute: int):
+        self.name = name
+        self.func = func
+        self.hour = hour
+        self.minute = minute
+        self.next_run = self._next_after(datetime.now())
+
+    def _next_after(self, moment: datetime) -> datetime:
+        run = moment.replace(hour=self.hour, minute=self.minute, second=0, microsecond=0)
+        return run if run > moment else run + timedelta(days=1)
+
+    def run(self):
+        try:
+            self.func()
+        except Exception:  # 1 job lỗi không được làm dừng scheduler
+            traceback.print_exc()
+        self.next_run = self._next_after(datetime.now())
+
+
+class DailyScheduler:
+    def __init__(self):
+        self._jobs: List[_DailyJob] = []
+        self._stop = threading.Event()
+        self._thread = None
+
+    def add_job(self, name: str, func: Callable[[], None], hour: int = 0, minute: int = 0):
+        self._jobs.append(_DailyJob(name, func, hour, minute))
+
+    def start(self):
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self):
+        while self._jobs:
+            due = min(job.next_run for job in self._jobs)
+            if self._stop.wait(max((due - datetime.now()).total_seconds(), 0)):
+                return
+            now = datetime.now()
+            for job in self._jobs:
+                if job.next_run <= now:
+                    job.run()
+
+
+scheduler = DailyScheduler()
@@ -0,0 +1,133 @@
+"""
+Quản lý partition theo tháng của bảng timesheets và lưu trữ các năm đã chốt.
+
+- ensure_partitions: tách partition pmax thành các tháng sắp tới (chạy hằng
+  tháng), để dữ liệu mới luôn rơi vào partition của đúng tháng.
+- archive_through_year: chép toàn bộ chấm công tới hết năm `year` sang
+  timesheets_archive (nén), rồi DROP các partition đó khỏi bảng chính
+  (tức thời, không phải DELETE từng dòng) => kích thước bảng nóng có giới hạn.
+
+Các câu ALTER TABLE là DDL, MySQL tự commit.
+"""
+import re
+from datetime import date
+from typing import List, Tuple
+
+from sqlalchemy import insert, select, text
+from sqlalchemy.orm import Session
+
+from app.models.timesheet_archive import TimesheetArchive
+from app.models.timesheets import Timesheet
+
+ARCHIVE_COLUMNS = ["id", "employee_id", "date", "check_in", "check_out", "working_hours"]
+DELETE_CHUNK_SIZE = 10000
+_PARTITION_NAME = re.compile(r"^p(\d{4})(\d{2})$")
+
+
+def _next_month(day: date) -> date:
+    return date(day.year + day.month // 12, day.month % 12 + 1, 1)
+
+
+def monthly_partitions(db: Session) -> List[Tuple[str, date]]:
+    """[(tên partition, tháng)] theo thứ tự, không gồm pmax. Rỗng nếu bảng chưa partition."""
+    rows = db.execute(
+        text(
+            "SELECT PARTITION_NAME FROM information_schema.PARTITIONS "
+            "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = :table "
+            "AND PARTITION_NAME IS NOT NULL ORDER BY PARTITION_ORDINAL_POSITION"
+        ),
+        {"table": Timesheet.__tablename__},
+    )
+
+    partitions = []
+    for (name,) in rows:
+        matched = _PARTITION_NAME.match(name)
+        if matched:
+            partitions.append((name, date(int(matched.group(1)), int(matched.group(2)), 1)))
+    return partitions
+
+
+def ensure_partitions(db: Session, months_ahead: int = 3) -> List[str]:
+    """Tạo partition cho các tháng tới (tính từ tháng hiện tại), trả về tên partition mới."""
+    partitions = monthly_partitions(db)
+    if not partitions:
+        return []
+
+    target = date.today().replace(day=1)
+    for _ in range(months_ahead):
+        target = _next_month(target)
+
+    month = _next_month(partitions[-1][1])
+    definitions, created = [], []
+    while month <= target:
+        name = f"p{month:%Y%m}"
+        definitions.append(
+            f"PARTITION {name} VALUES LESS THAN (TO_DAYS('{_next_month(month).isoformat()}'))"
+        )
+        created.append(name)
+        month = _next_month(month)
+
+    if definitions:
+        definitions.append("PARTITION pmax VALUES LESS THAN MAXVALUE")
+        db.execute(
+            text(
+                f"ALTER TABLE {Timesheet.__tablename__} REORGANIZE PARTITION pmax "
+                f"INTO ({', '.join(definitions)})"
+            )
+        )
+    return created
+
+
+def archive_through_year(db: Session, year: int) -> Tuple[int, List[str]]:
+    """
+    Chuyển mọi dòng có date <= 31/12/year sang bảng archive.
+    Trả về (số dòng đã chép, các partition đã drop).
+    """
+    if year >= date.today().year:
+        raise ValueError("Chỉ lưu trữ được các năm đã kết thúc")
+
+    end = date(year + 1, 1, 1)
+
+    # INSERT IGNORE: chạy lại sau khi bị gián đoạn không lỗi trùng khóa
+    archived = db.execute(
+        insert(TimesheetArchive)
+        .prefix_with("IGNORE")
+        .from_select(
+            ARCHIVE_COLUMNS,
+            select(*(getattr(Timesheet, column) for column in ARCHIVE_COLUMNS)).where(
+                Timesheet.date < end
+            ),
+        )
+    ).rowcount
+    db.commit()
+
+    # Partition đầu tiên chứa mọi ngày nhỏ hơn cận trên của nó, nên chỉ drop
+    # được khi đã lưu trữ toàn bộ dữ liệu trước `end` (đúng như trên)
+    partitions = monthly_partitions(db)
+    dropped = [name for name, month in partitions if _next_month(month) <= end]
+    if dropped:
+        db.execute(
+            text(f"ALTER TABLE {Timesheet.__tablename__} DROP PARTITION {', '.join(dropped)}")
+        )
+
+    # Dòng đã chép nhưng còn lại trong bảng chính - bảng chưa partition (chưa
+    # chạy migration 0006) hoặc partition không drop được (vd: dòng nhập lùi
+    # ngày nằm trong partition đầu tiên): xóa theo lô nhỏ, nếu không
+    # include_archive=true sẽ trả về 2 lần. Chỉ xóa dòng đã có trong archive
+    # (dòng nhập lùi ngày trong lúc đang chạy vẫn giữ lại cho lần sau).
+    table = Timesheet.__tablename__
+    archive_table = TimesheetArchive.__tablename__
+    while True:
+        deleted = db.execute(
+            text(
+                f"DELETE FROM {table} WHERE date < :end AND EXISTS ("
+                f"SELECT 1 FROM {archive_table} a WHERE a.id = {table}.id"
+                f") LIMIT {DELETE_CHUNK_SIZE}"
+            ),
+            {"end": end},
+        ).rowcount
+        db.commit()
+        if not deleted:
+            break
+
+    return archived, dropped
@@ -0,0 +1,176 @@
+"""
+Ghi chấm công hàng loạt (máy chấm công gửi dồn lúc đổi ca).
+
+- bulk_ingest: kiểm tra + INSERT executemany theo chunk trong 1 transaction,
+  trả về lỗi theo từng sự kiện (index trong lô).
+- WriteBehindBuffer: gom sự kiện từ nhiều request, 1 thread nền flush khi đủ
+  TIMESHEET_BUFFER_MAX_EVENTS sự kiện hoặc sự kiện cũ nhất đã chờ quá
+  TIMESHEET_BUFFER_MAX_DELAY_MS. Mỗi sự kiện có 1 Future, được resolve SAU
+  khi commit => request chỉ nhận ack khi dữ liệu đã ghi xuống DB.
+  Lô lỗi khi ghi chung được ghi lại từng sự kiện, để 1 sự kiện hỏng không
+  làm hỏng cả lô; lỗi bất ngờ chỉ làm fail lô hiện tại, thread vẫn chạy tiếp.
+"""
+import os
+import threading
+import time
+from concurrent.futures import Future, InvalidStateError
+from typing import Dict, List, Tuple
+
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from app.database import SessionLocal
+from app.models.employees import Employee
+from app.models.timesheets import Timesheet
+from app.utils.working_hours import fill_working_hours
+
+INSERT_CHUNK_SIZE = 1000
+TIMESHEET_BUFFER_MAX_EVENTS = int(os.getenv("TIMESHEET_BUFFER_MAX_EVENTS", "500"))
+TIMESHEET_BUFFER_MAX_DELAY_MS = int(os.getenv("TIMESHEET_BUFFER_MAX_DELAY_MS", "200"))
+# Thời gian tối đa 1 request chờ ack từ bộ đệm
+TIMESHEET_BUFFER_ACK_TIMEOUT = float(os.getenv("TIMESHEET_BUFFER_ACK_TIMEOUT", "30"))
+
+
+def validate_events(db: Session, rows: List[dict]) -> Dict[int, str]:
+    """Trả về {index: lỗi} cho các sự kiện không ghi được."""
+    employee_ids = {row["employee_id"] for row in rows}
+    known_ids = {
+        employee_id
+        for (employee_id,) in db.query(Employee.id).filter(Employee.id.in_(employee_ids))
+    } if employee_ids else set()
+
+    errors = {}
+    for index, row in enumerate(rows):
+        if row["employee_id"] not in known_ids:
+            errors[index] = f"Không tìm thấy nhân viên {row['employee_id']}"
+    return errors
+
+
+def insert_rows(db: Session, rows: List[dict]):
+    for start in range(0, len(rows), INSERT_CHUNK_SIZE):
+        db.execute(insert(Timesheet), rows[start:start + INSERT_CHUNK_SIZE])
+
+
+def bulk_ingest(db: Session, rows: List[dict]) -> Dict[int, str]:
+    """Ghi các sự kiện hợp lệ, trả về lỗi của các sự kiện bị từ chối. Caller tự commit."""
+    errors = validate_events(db, rows)
+    insert_rows(
+        db,
+        [fill_working_hours(row) for index, row in enumerate(rows) if index not in errors],
+    )
+    return errors
+
+
+class WriteBehindBuffer:
+    def __init__(
+        self,
+        max_events: int = TIMESHEET_BUFFER_MAX_EVENTS,
+        max_delay_ms: int = TIMESHEET_BUFFER_MAX_DELAY_MS,
+    ):
+        self._max_events = max_events
+        self._max_delay = max_delay_ms / 1000
+        self._cond = threading.Condition()
+        self._pending: List[Tuple[dict, Future]] = []
+        self._oldest_at = 0.0
+        self._closed = False
+        self._thread = None
+
+    def submit(self, rows: List[dict]) -> List[Future]:
+        futures = []
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("Bộ đệm chấm công đã dừng")
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, daemon=True)
+                self._thread.start()
+
+            if not self._pending:
+                self._oldest_at = time.monotonic()
+            for row in rows:
+                future = Future()
+                self._pending.append((row, future))
+                futures.append(future)
+            self._cond.notify()
+        return futures
+
+    def close(self):
+        """Dừng nhận sự kiện mới và flush hết phần còn lại."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+            thread = self._thread
+        if thread is not None:
+            thread.join()
+
+    def _next_batch(self) -> List[Tuple[dict, Future]]:
+        with self._cond:
+            while not self._closed and len(self._pending) < self._max_events:
+                if not self._pending:
+                    self._cond.wait()
+                    continue
+                remaining = self._oldest_at + self._max_delay - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+
+            batch = self._pending[:self._max_events]
+            self._pending = self._pending[self._max_events:]
+            if self._pending:
+                self._oldest_at = time.monotonic()
+            return batch
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            if not batch:
+                return  # chỉ xảy ra khi đã close() và không còn sự kiện
+            try:
+                self._flush(batch)
+            except Exception as exc:  # không để thread chết => request treo
+                for _, future in batch:
+                    _resolve(future, error=exc)
+
+    def _flush(self, batch: List[Tuple[dict, Future]]):
+        rows = [row for row, _ in batch]
+        db = SessionLocal()
+        try:
+            errors = bulk_ingest(db, rows)
+            db.commit()
+        except Exception:
+            # Ghi chung thất bại (vd: 1 sự kiện sai dữ liệu): ghi lại từng sự kiện
+            db.rollback()
+            self._flush_each(db, batch)
+            return
+        finally:
+            db.close()
+
+        for index, (_, future) in enumerate(batch):
+            if index in errors:
+                _resolve(future, error=ValueError(errors[index]))
+            else:
+                _resolve(future)
+
+    def _flush_each(self, db: Session, batch: List[Tuple[dict, Future]]):
+        for row, future in batch:
+            try:
+                errors = bulk_ingest(db, [row])
+                db.commit()
+            except Exception as exc:
+                db.rollback()
+                _resolve(future, error=exc)
+                continue
+            _resolve(future, error=ValueError(errors[0]) if errors else None)
+
+
+def _resolve(future: Future, error: Exception = None):
+    # Request có thể đã hủy chờ (timeout / ngắt kết nối): bỏ qua Future đã xong
+    try:
+        if error is None:
+            future.set_result(True)
+        else:
+            future.set_exception(error)
+    except InvalidStateError:
+        pass
+
+
+timesheet_buffer = WriteBehindBuffer()
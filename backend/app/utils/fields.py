@@ -0,0 +1,74 @@
+from typing import Dict, List, Optional, Tuple, Type
+
+from fastapi import HTTPException, status
+from fastapi.encoders import jsonable_encoder
+from pydantic import BaseModel
+from sqlalchemy.orm import joinedload, load_only
+
+
+class Projection:
+    """
+    Sparse fieldset (`?fields=a,b,c`) cho các endpoint danh sách.
+
+    - Cột thường: chỉ SELECT các cột được yêu cầu (load_only)
+    - Quan hệ (department, employee, ...): chỉ JOIN khi được yêu cầu,
+      và chỉ lấy các cột mà schema con cần
+    `id` luôn được trả về (dùng làm khóa / cursor phía client).
+    """
+
+    def __init__(
+        self,
+        model,
+        schema: Type[BaseModel],
+        relations: Optional[Dict[str, Tuple[object, Type[BaseModel]]]] = None,
+    ):
+        self.model = model
+        self.relations = relations or {}
+        self.allowed = list(schema.__fields__)
+
+    def parse(self, fields: Optional[str]) -> Optional[List[str]]:
+        if not fields:
+            return None
+
+        selected = ["id"]
+        for name in fields.split(","):
+            name = name.strip()
+            if name and name not in selected:
+                selected.append(name)
+
+        unknown = [name for name in selected if name not in self.allowed]
+        if unknown:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Trường không hợp lệ: {', '.join(unknown)}",
+            )
+
+        return selected
+
+    def options(self, selected: List[str]) -> list:
+        columns = [getattr(self.model, name) for name in selected if name not in self.relations]
+        options = [load_only(*columns)]
+
+        for name in selected:
+            if name in self.relations:
+                relationship_attr, schema = self.relations[name]
+                target = relationship_attr.property.mapper.class_
+                options.append(
+                    joinedload(relationship_attr).load_only(
+                        *[getattr(target, field) for field in schema.__fields__]
+                    )
+                )
+
+        return options
+
+    def serialize(self, obj, selected: List[str]) -> dict:
+        data = {}
+        for name in selected:
+            value = getattr(obj, name)
+            if name in self.relations and value is not None:
+                # Schema con chỉ khai báo orm_mode (cú pháp v1), pydantic v2 cần
+                # from_attributes=True tường minh khi validate từ object ORM
+                schema = self.relations[name][1]
+                value = schema.model_validate(value, from_attributes=True).model_dump()
+            data[name] = value
+        return jsonable_encoder(data)
@@ -0,0 +1,40 @@
+from typing import Optional, Tuple
+
+
+class RangeNotSatisfiable(Exception):
+    pass
+
+
+def parse_byte_range(header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """
+    Đọc header Range dạng "bytes=start-end" / "bytes=start-" / "bytes=-suffix".
+    Trả về (start, end) tính cả 2 đầu, hoặc None nếu không có / không hỗ trợ
+    (nhiều khoảng) => trả về toàn bộ file với status 200.
+    """
+    if not header or not header.startswith("bytes="):
+        return None
+
+    spec = header[len("bytes="):].strip()
+    if "," in spec:
+        return None
+
+    start_text, sep, end_text = spec.partition("-")
+    if not sep:
+        return None
+
+    try:
+        if start_text:
+            start = int(start_text)
+            end = int(end_text) if end_text else size - 1
+        else:
+            suffix = int(end_text)
+            if suffix <= 0:
+                raise RangeNotSatisfiable()
+            start, end = max(size - suffix, 0), size - 1
+    except ValueError:
+        return None
+
+    if start >= size or start > end:
+        raise RangeNotSatisfiable()
+
+    return start, min(end, size - 1)
@@ -0,0 +1,30 @@
+import base64
+import json
+from typing import Optional
+
+from fastapi import HTTPException, status
+
+
+def encode_cursor(last_id: int) -> str:
+    """Mã hóa id của bản ghi cuối trang thành token mờ (opaque) cho client."""
+    raw = json.dumps({"id": last_id}, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> int:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return int(data["id"])
+    except (ValueError, KeyError, TypeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Cursor không hợp lệ",
+        )
+
+
+def next_cursor_for(items: list, has_more: bool) -> Optional[str]:
+    # items đã được cắt đúng page_size, cursor trỏ tới bản ghi cuối cùng
+    if not has_more or not items:
+        return None
+    return encode_cursor(items[-1].id)
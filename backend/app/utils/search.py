@@ -0,0 +1,41 @@
+import re
+from typing import Optional, Tuple
+
+from sqlalchemy import or_
+from sqlalchemy.dialects.mysql import match
+
+# Phải khớp với biến ngram_token_size của MySQL (mặc định = 2).
+# Từ khóa ngắn hơn giá trị này không có token nào trong index FULLTEXT.
+NGRAM_TOKEN_SIZE = 2
+
+# Từ khóa luôn được bọc thành cụm '"..."' (toán tử BOOLEAN MODE bên trong cụm
+# không có tác dụng), chỉ cần bỏ dấu nháy kép để người dùng không đóng cụm được.
+_PHRASE_QUOTE = re.compile(r'"')
+
+
+def _escape_like(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def fulltext_search(term: str, *columns) -> Tuple[Optional[object], Optional[object]]:
+    """
+    Trả về (điều kiện lọc, biểu thức điểm liên quan) cho `term` trên các cột
+    đã có index FULLTEXT (parser ngram).
+
+    - Từ khóa đủ dài: MATCH ... AGAINST ('"term"' IN BOOLEAN MODE), dùng index
+      FULLTEXT và trả về điểm để sắp xếp theo mức độ liên quan.
+    - Từ khóa quá ngắn: tìm theo tiền tố (LIKE 'x%'). full_name không có index
+      B-tree nên điều kiện OR này quét bảng; chấp nhận được vì chỉ áp dụng cho
+      từ khóa 1 ký tự.
+    """
+    cleaned = " ".join(_PHRASE_QUOTE.sub(" ", term).split())
+    if not cleaned:
+        return None, None
+
+    if len(cleaned) < NGRAM_TOKEN_SIZE:
+        prefix = f"{_escape_like(cleaned)}%"
+        return or_(*[col.like(prefix) for col in columns]), None
+
+    # Đặt MATCH trực tiếp trong WHERE để optimizer chọn index FULLTEXT
+    score = match(*columns, against=f'"{cleaned}"').in_boolean_mode()
+    return score, score
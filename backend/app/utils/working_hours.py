@@ -0,0 +1,40 @@
+from datetime import time
+from decimal import ROUND_HALF_UP, Decimal
+from typing import Optional
+
+from sqlalchemy import case, func
+
+SECONDS_PER_DAY = 24 * 3600
+TWO_PLACES = Decimal("0.01")
+
+
+def compute_working_hours(check_in: Optional[time], check_out: Optional[time]) -> Optional[Decimal]:
+    """
+    Số giờ giữa check_in và check_out (làm tròn 2 chữ số).
+    check_out < check_in được hiểu là ca đêm, ra về vào ngày hôm sau.
+    """
+    if check_in is None or check_out is None:
+        return None
+
+    seconds = (
+        (check_out.hour * 3600 + check_out.minute * 60 + check_out.second)
+        - (check_in.hour * 3600 + check_in.minute * 60 + check_in.second)
+    )
+    if seconds < 0:
+        seconds += SECONDS_PER_DAY
+
+    return (Decimal(seconds) / 3600).quantize(TWO_PLACES, rounding=ROUND_HALF_UP)
+
+
+def fill_working_hours(values: dict) -> dict:
+    # Chỉ tính khi client không gửi working_hours
+    if values.get("working_hours") is None:
+        values["working_hours"] = compute_working_hours(values.get("check_in"), values.get("check_out"))
+    return values
+
+
+def working_hours_expression(check_in, check_out):
+    """Biểu thức SQL tương đương compute_working_hours (dùng cho UPDATE hàng loạt)."""
+    seconds = func.time_to_sec(check_out) - func.time_to_sec(check_in)
+    seconds = case((seconds < 0, seconds + SECONDS_PER_DAY), else_=seconds)
+    return func.round(seconds / 3600, 2)
@@ -0,0 +1,76 @@
+"""
+EXPLAIN truy vấn của các endpoint danh sách để kiểm tra index đang được dùng.
+
+    python explain_queries.py
+"""
+from sqlalchemy import text
+
+from app.database import SessionLocal, engine
+from app.models.employees import Employee
+from app.models.labor_contracts import LaborContract
+from app.models.payrolls import Payroll
+from app.models.reward_discipline import RewardDiscipline
+from app.models.timesheets import Timesheet
+from app.routers.payrolls_router import PAYROLL_LIST_MAX_LIMIT
+
+
+def endpoint_queries(db):
+    # Giá trị mẫu chỉ để optimizer có tham số cụ thể.
+    # Bộ lọc / ORDER BY / LIMIT phải giữ đúng như trong router tương ứng.
+    return {
+        "GET /employees/paged": (
+            db.query(Employee)
+            .filter(
+                Employee.deleted == False,
+                Employee.department_id == 1,
+                Employee.status == "active",
+            )
+            .order_by(Employee.id.desc())
+            .limit(10 + 1)  # page_size + 1 để biết còn trang sau
+        ),
+        "GET /payrolls/": (
+            db.query(Payroll)
+            .filter(Payroll.employee_id == 1, Payroll.year == 2025, Payroll.month == 1)
+            .order_by(Payroll.year.desc(), Payroll.month.desc(), Payroll.id.desc())
+            .limit(PAYROLL_LIST_MAX_LIMIT)
+        ),
+        "GET /timesheets/": (
+            db.query(Timesheet)
+            .filter(Timesheet.employee_id == 1)
+            .order_by(Timesheet.date.desc())
+        ),
+        "GET /rewards/": (
+            db.query(RewardDiscipline)
+            .filter(RewardDiscipline.employee_id == 1)
+            .order_by(RewardDiscipline.date.desc())
+        ),
+        "GET /contracts/": (
+            db.query(LaborContract)
+            .filter(LaborContract.employee_id == 1)
+            .order_by(LaborContract.id.desc())
+        ),
+    }
+
+
+def explain_all():
+    db = SessionLocal()
+    try:
+        for endpoint, query in endpoint_queries(db).items():
+            sql = str(
+                query.statement.compile(
+                    dialect=engine.dialect,
+                    compile_kwargs={"literal_binds": True},
+                )
+            )
+            print(f"== {endpoint}")
+            for row in db.execute(text(f"EXPLAIN {sql}")).mappings():
+                print(
+                    f"   table={row['table']} type={row['type']} key={row['key']} "
+                    f"rows={row['rows']} extra={row['Extra']}"
+                )
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    explain_all()
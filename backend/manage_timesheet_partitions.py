@@ -0,0 +1,34 @@
+import argparse
+
+from app.database import SessionLocal
+from app.services.timesheet_archive import archive_through_year, ensure_partitions
+
+
+def main():
+    # ensure: chạy hằng tháng (cron) để luôn có sẵn partition cho các tháng tới
+    # archive <năm>: chuyển chấm công tới hết năm đó sang timesheets_archive
+    parser = argparse.ArgumentParser(description="Quản lý partition / lưu trữ bảng timesheets")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    ensure = commands.add_parser("ensure")
+    ensure.add_argument("--months-ahead", type=int, default=3)
+
+    archive = commands.add_parser("archive")
+    archive.add_argument("year", type=int)
+
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        if args.command == "ensure":
+            created = ensure_partitions(db, args.months_ahead)
+            print(f"Đã tạo partition: {', '.join(created) or '(không có)'}")
+        else:
+            archived, dropped = archive_through_year(db, args.year)
+            print(f"Đã lưu trữ {archived} dòng, drop partition: {', '.join(dropped) or '(không có)'}")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,17 @@
+from app.database import SessionLocal
+from app.services.department_stats import rebuild_all
+
+
+def rebuild_department_stats():
+    # Tính lại toàn bộ department_stats / department_payroll_stats từ dữ liệu gốc
+    db = SessionLocal()
+    try:
+        rebuild_all(db)
+        db.commit()
+        print("Đã tính lại thống kê phòng ban.")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    rebuild_department_stats()
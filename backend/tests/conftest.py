@@ -0,0 +1,8 @@
+import os
+
+# app.database dựng URL kết nối ngay khi import; test không mở kết nối thật
+os.environ.setdefault("DATABASE_USERNAME", "test")
+os.environ.setdefault("DATABASE_PASSWORD", "test")
+os.environ.setdefault("DATABASE_HOST", "localhost")
+os.environ.setdefault("DATABASE_PORT", "3306")
+os.environ.setdefault("DATABASE_NAME", "hr_test")
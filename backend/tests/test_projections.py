@@ -0,0 +1,51 @@
+from types import SimpleNamespace
+
+import pytest
+
+from app.routers.contracts_router import CONTRACT_PROJECTION
+from app.routers.employees_router import EMPLOYEE_PROJECTION
+from app.routers.payrolls_router import PAYROLL_PROJECTION
+
+SAMPLE_VALUES = {int: 7, str: "Phòng Kỹ thuật", float: 1500000.0}
+
+PROJECTION_RELATIONS = [
+    (projection, name)
+    for projection in (EMPLOYEE_PROJECTION, PAYROLL_PROJECTION, CONTRACT_PROJECTION)
+    for name in projection.relations
+]
+
+
+def _fake_related(schema):
+    # Object giả lập bản ghi ORM: chỉ có thuộc tính, không phải dict
+    return SimpleNamespace(
+        **{
+            field: SAMPLE_VALUES[info.annotation]
+            for field, info in schema.model_fields.items()
+        }
+    )
+
+
+@pytest.mark.parametrize(
+    "projection, relation",
+    PROJECTION_RELATIONS,
+    ids=[f"{p.model.__name__}.{name}" for p, name in PROJECTION_RELATIONS],
+)
+def test_serialize_relation(projection, relation):
+    schema = projection.relations[relation][1]
+    related = _fake_related(schema)
+    obj = SimpleNamespace(id=1, **{relation: related})
+
+    data = projection.serialize(obj, projection.parse(relation))
+
+    assert data == {"id": 1, relation: vars(related)}
+
+
+@pytest.mark.parametrize(
+    "projection, relation",
+    PROJECTION_RELATIONS,
+    ids=[f"{p.model.__name__}.{name}" for p, name in PROJECTION_RELATIONS],
+)
+def test_serialize_missing_relation(projection, relation):
+    obj = SimpleNamespace(id=1, **{relation: None})
+
+    assert projection.serialize(obj, ["id", relation]) == {"id": 1, relation: None}
@@ -77,12 +77,15 @@ const DashboardPage: React.FC = () => {
         const employees = await apiGet<any[]>("/employees");
         const departments = await apiGet<any[]>("/departments");
         const contracts = await apiGet<any[]>("/contracts");
-        const payrolls = await apiGet<any[]>("/payrolls");
+        // Chỉ cần tổng số bảng lương: lấy 1 dòng, đọc total
+        const payrolls = await apiGet<{ total: number }>(
+          "/payrolls/paged?page_size=1"
+        );
 
         setTotalEmployees(employees.length);
         setTotalDepartments(departments.length);
         setTotalContracts(contracts.length);
-        setTotalPayrolls(payrolls.length);
+        setTotalPayrolls(payrolls.total);
 
         const statusCount = { active: 0, inactive: 0 };
         employees.forEach((e) => {
@@ -31,6 +31,13 @@ type Payroll = {
   };
 };
 
+type PaginatedResponse<T> = {
+  items: T[];
+  total: number;
+  page: number;
+  page_size: number;
+};
+
 type SortField =
   | "base_salary"
   | "allowance"
@@ -64,29 +71,50 @@ const PayrollList: React.FC = () => {
   const [sortField, setSortField] = useState<SortField>(null);
   const [sortDirection, setSortDirection] = useState<SortDirection>("asc");
 
-  // Load bảng lương và danh sách nhân viên
-  useEffect(() => {
-    const fetchData = async () => {
-      try {
-        setLoading(true);
-        const [payrollData, employeeData] = await Promise.all([
-          apiGet<Payroll[]>("/payrolls"),
-          apiGet<{ id: number; full_name: string }[]>("/employees"),
-        ]);
+  // Pagination (server-side, lọc theo tháng/năm ở backend)
+  const [currentPage, setCurrentPage] = useState(1);
+  const pageSize = 20;
+  const [total, setTotal] = useState(0);
 
-        setPayrolls(payrollData);
-        setEmployees(employeeData);
-      } catch (err) {
-        console.error(err);
-        setError("Không thể tải bảng lương.");
-      } finally {
-        setLoading(false);
+  const fetchPayrolls = async () => {
+    try {
+      setLoading(true);
+      const params = new URLSearchParams({
+        page: String(currentPage),
+        page_size: String(pageSize),
+      });
+      if (monthFilter) {
+        const [year, month] = monthFilter.split("-");
+        params.set("month", String(Number(month)));
+        params.set("year_from", year);
+        params.set("year_to", year);
       }
-    };
 
-    fetchData();
+      const data = await apiGet<PaginatedResponse<Payroll>>(
+        `/payrolls/paged?${params.toString()}`
+      );
+      setPayrolls(data.items);
+      setTotal(data.total);
+    } catch (err) {
+      console.error(err);
+      setError("Không thể tải bảng lương.");
+    } finally {
+      setLoading(false);
+    }
+  };
+
+  // Load danh sách nhân viên (dùng khi bảng lương không kèm tên nhân viên)
+  useEffect(() => {
+    apiGet<{ id: number; full_name: string }[]>("/employees")
+      .then(setEmployees)
+      .catch((err) => console.error(err));
   }, []);
 
+  // Load bảng lương theo trang / tháng
+  useEffect(() => {
+    fetchPayrolls();
+  }, [currentPage, monthFilter]);
+
   // Handle sorting
   const handleSort = (field: SortField) => {
     if (sortField === field) {
@@ -130,9 +158,8 @@ const PayrollList: React.FC = () => {
     try {
       await apiDelete(`/payrolls/${id}`);
       alert("Xóa bảng lương thành công!");
-      // Tải lại danh sách
-      const [payrollData] = await Promise.all([apiGet<Payroll[]>("/payrolls")]);
-      setPayrolls(payrollData);
+      // Tải lại trang hiện tại
+      await fetchPayrolls();
     } catch (err) {
       console.error(err);
       alert("Lỗi! Không thể xóa bảng lương.");
@@ -147,14 +174,6 @@ const PayrollList: React.FC = () => {
       return name.toLowerCase().includes(search.toLowerCase());
     });
 
-    // Filter by month and year
-    if (monthFilter) {
-      const [year, month] = monthFilter.split("-").map(Number);
-      filtered = filtered.filter((p) => {
-        return p.month === month && p.year === year;
-      });
-    }
-
     // Apply sorting
     if (sortField) {
       filtered = [...filtered].sort((a, b) => {
@@ -170,7 +189,9 @@ const PayrollList: React.FC = () => {
     }
 
     return filtered;
-  }, [payrolls, search, monthFilter, sortField, sortDirection, employees]);
+  }, [payrolls, search, sortField, sortDirection, employees]);
+
+  const totalPages = Math.max(Math.ceil(total / pageSize), 1);
 
   if (loading) return <p className="m-3 text-center">Đang tải dữ liệu...</p>;
   if (error) return <div className="alert alert-danger m-3">{error}</div>;
@@ -209,7 +230,10 @@ const PayrollList: React.FC = () => {
                     type="month"
                     className="form-control"
                     value={monthFilter}
-                    onChange={(e) => setMonthFilter(e.target.value)}
+                    onChange={(e) => {
+                      setMonthFilter(e.target.value);
+                      setCurrentPage(1);
+                    }}
                   />
                 </div>
 
@@ -348,6 +372,47 @@ const PayrollList: React.FC = () => {
               </tbody>
             </table>
           </div>
+
+          {/* PAGINATION */}
+          <nav className="mt-3">
+            <ul className="pagination justify-content-center">
+              <li className={`page-item ${currentPage === 1 && "disabled"}`}>
+                <button
+                  className="page-link"
+                  onClick={() => setCurrentPage((p) => p - 1)}
+                >
+                  «
+                </button>
+              </li>
+
+              {Array.from({ length: totalPages }, (_, i) => i + 1).map((p) => (
+                <li
+                  key={p}
+                  className={`page-item ${p === currentPage && "active"}`}
+                >
+                  <button
+                    className="page-link"
+                    onClick={() => setCurrentPage(p)}
+                  >
+                    {p}
+                  </button>
+                </li>
+              ))}
+
+              <li
+                className={`page-item ${
+                  currentPage === totalPages && "disabled"
+                }`}
+              >
+                <button
+                  className="page-link"
+                  onClick={() => setCurrentPage((p) => p + 1)}
+                >
+                  »
+                </button>
+              </li>
+            </ul>
+          </nav>
         </div>
       </div>
     </div>